@@ -0,0 +1,52 @@
+﻿"""composite indexes for per-user transaction queries
+
+Revision ID: 0002_composite_indexes
+Revises: 0001_initial
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_composite_indexes"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_user_date_created",
+            "transactions",
+            ["user_id", sa.text("date DESC"), sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_transactions_user_type_date",
+            "transactions",
+            ["user_id", "type", "date"],
+            unique=False,
+            postgresql_include=["amount"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_user_type_date",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_transactions_user_date_created",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
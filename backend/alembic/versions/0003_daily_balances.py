@@ -0,0 +1,52 @@
+﻿"""daily balances rollup
+
+Revision ID: 0003_daily_balances
+Revises: 0002_composite_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003_daily_balances"
+down_revision = "0002_composite_indexes"
+branch_labels = None
+depends_on = None
+
+NO_CATEGORY_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def upgrade() -> None:
+    transaction_type = postgresql.ENUM(name="transaction_type", create_type=False)
+
+    op.create_table(
+        "daily_balances",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True, nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("type", transaction_type, nullable=False),
+        sa.Column("category_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("amount_total", sa.Numeric(18, 2), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "uq_daily_balances_key",
+        "daily_balances",
+        ["user_id", "date", "type", sa.text(f"coalesce(category_id, '{NO_CATEGORY_UUID}'::uuid)")],
+        unique=True,
+    )
+    op.execute(
+        """
+        INSERT INTO daily_balances (user_id, date, type, category_id, amount_total, transaction_count)
+        SELECT user_id, date, type, category_id, sum(amount), count(*)
+        FROM transactions
+        GROUP BY user_id, date, type, category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_daily_balances_key", table_name="daily_balances")
+    op.drop_table("daily_balances")
@@ -0,0 +1,25 @@
+﻿"""per-user data version for ETags
+
+Revision ID: 0004_user_data_version
+Revises: 0003_daily_balances
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_user_data_version"
+down_revision = "0003_daily_balances"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("data_version", sa.BigInteger(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "data_version")
@@ -1,11 +1,48 @@
 ﻿from datetime import date
 from decimal import Decimal
+from enum import Enum
+from uuid import UUID
 from pydantic import BaseModel
 
 
+class TimeseriesGranularity(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
 class DashboardSummary(BaseModel):
     start_date: date | None
     end_date: date | None
     total_income: Decimal
     total_expense: Decimal
     balance: Decimal
+    transaction_count: int
+
+
+class TimeseriesPoint(BaseModel):
+    period: date
+    total_income: Decimal
+    total_expense: Decimal
+    balance: Decimal
+
+
+class DashboardTimeseries(BaseModel):
+    granularity: TimeseriesGranularity
+    start_date: date | None
+    end_date: date | None
+    items: list[TimeseriesPoint]
+
+
+class CategoryBreakdownItem(BaseModel):
+    category_id: UUID | None
+    name: str
+    total_income: Decimal
+    total_expense: Decimal
+    transaction_count: int
+
+
+class DashboardCategoryBreakdown(BaseModel):
+    start_date: date | None
+    end_date: date | None
+    items: list[CategoryBreakdownItem]
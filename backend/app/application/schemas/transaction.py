@@ -1,11 +1,14 @@
 ﻿from datetime import date, datetime
 from decimal import Decimal
+from typing import Annotated, Literal
 
 MAX_AMOUNT = Decimal("999999999999.99")
 from uuid import UUID
 from pydantic import BaseModel, Field
 from app.domain.entities.transaction import TransactionType
 
+MAX_BATCH_OPERATIONS = 1000
+
 
 class TransactionCreate(BaseModel):
     category_id: UUID | None = None
@@ -32,3 +35,54 @@ class TransactionOut(BaseModel):
     date: date
     created_at: datetime
     updated_at: datetime
+
+
+class TransactionImportError(BaseModel):
+    line: int
+    message: str
+
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    error_count: int
+    errors: list[TransactionImportError]
+
+
+class TransactionBatchCreate(TransactionCreate):
+    op: Literal["create"]
+
+
+class TransactionBatchUpdate(TransactionUpdate):
+    op: Literal["update"]
+    id: UUID
+
+
+class TransactionBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: UUID
+
+
+TransactionBatchOperation = Annotated[
+    TransactionBatchCreate | TransactionBatchUpdate | TransactionBatchDelete,
+    Field(discriminator="op"),
+]
+
+
+class TransactionBatchRequest(BaseModel):
+    operations: list[TransactionBatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+class TransactionBatchItem(BaseModel):
+    index: int
+    op: Literal["create", "update", "delete"]
+    id: UUID
+    transaction: TransactionOut | None
+
+
+class TransactionBatchError(BaseModel):
+    index: int
+    message: str
+
+
+class TransactionBatchResult(BaseModel):
+    items: list[TransactionBatchItem]
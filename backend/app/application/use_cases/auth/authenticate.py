@@ -10,3 +10,14 @@ def authenticate_user(user_repo: UserRepository, email: str, password: str, veri
     if not verify_password(password, user.hashed_password):
         return None
     return user
+
+
+async def authenticate_user_async(user_repo, email: str, password: str, verify_password) -> object | None:
+    user = await user_repo.get_by_email(email)
+    if not user:
+        return None
+    if not user.is_active:
+        return None
+    if not await verify_password(password, user.hashed_password):
+        return None
+    return user
@@ -2,8 +2,22 @@
 
 
 def register_user(user_repo: UserRepository, email: str, password: str, hash_password) -> object:
-    existing = user_repo.get_by_email(email)
-    if existing:
+    # Consulta barata antes do bcrypt: e-mail repetido não ocupa o pool de hash.
+    # O ON CONFLICT do create continua cobrindo cadastros simultâneos.
+    if user_repo.get_by_email(email):
         raise ValueError("E-mail já cadastrado")
     hashed_password = hash_password(password)
-    return user_repo.create(email=email, hashed_password=hashed_password)
+    user = user_repo.create(email=email, hashed_password=hashed_password)
+    if not user:
+        raise ValueError("E-mail já cadastrado")
+    return user
+
+
+async def register_user_async(user_repo, email: str, password: str, hash_password) -> object:
+    if await user_repo.get_by_email(email):
+        raise ValueError("E-mail já cadastrado")
+    hashed_password = await hash_password(password)
+    user = await user_repo.create(email=email, hashed_password=hashed_password)
+    if not user:
+        raise ValueError("E-mail já cadastrado")
+    return user
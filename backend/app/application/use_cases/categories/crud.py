@@ -1,10 +1,19 @@
 ﻿from uuid import UUID
 from app.domain.entities.category import CategoryType
 from app.domain.repositories.category_repository import CategoryRepository
+from app.domain.repositories.query_cache import CATEGORIES_CACHE, QueryCache
 
 
-def list_categories(category_repo: CategoryRepository, user_id: UUID):
-    return category_repo.list_by_user(user_id)
+def list_categories(category_repo: CategoryRepository, user_id: UUID, cache: QueryCache | None = None):
+    if cache is None:
+        return category_repo.list_by_user(user_id)
+    return cache.get_or_load(CATEGORIES_CACHE, user_id, (), lambda: category_repo.list_by_user(user_id))
+
+
+async def list_categories_async(category_repo, user_id: UUID, cache: QueryCache | None = None):
+    if cache is None:
+        return await category_repo.list_by_user(user_id)
+    return await cache.get_or_load_async(CATEGORIES_CACHE, user_id, (), lambda: category_repo.list_by_user(user_id))
 
 
 def create_category(category_repo: CategoryRepository, user_id: UUID, name: str, type: CategoryType):
@@ -23,3 +32,15 @@ def update_category(
 
 def delete_category(category_repo: CategoryRepository, user_id: UUID, category_id: UUID) -> bool:
     return category_repo.delete(category_id=category_id, user_id=user_id)
+
+
+async def create_category_async(category_repo, user_id: UUID, name: str, type: CategoryType):
+    return await category_repo.create(user_id=user_id, name=name, type=type)
+
+
+async def update_category_async(category_repo, user_id: UUID, category_id: UUID, name: str, type: CategoryType):
+    return await category_repo.update(category_id=category_id, user_id=user_id, name=name, type=type)
+
+
+async def delete_category_async(category_repo, user_id: UUID, category_id: UUID) -> bool:
+    return await category_repo.delete(category_id=category_id, user_id=user_id)
@@ -0,0 +1,49 @@
+﻿from datetime import date
+from decimal import Decimal
+from uuid import UUID
+from app.domain.repositories.transaction_repository import TransactionRepository
+
+UNCATEGORIZED_NAME = "Sem categoria"
+OTHERS_NAME = "Outros"
+
+
+def _fold_top(rows: list[dict], top: int | None) -> list[dict]:
+    # Linhas já vêm ordenadas pelo volume movimentado (entradas + saídas).
+    items = [{**row, "name": row["name"] or UNCATEGORIZED_NAME} for row in rows]
+    if not top or len(items) <= top:
+        return items
+
+    rest = items[top:]
+    items = items[:top]
+    items.append(
+        {
+            "category_id": None,
+            "name": OTHERS_NAME,
+            "total_income": sum((Decimal(r["total_income"]) for r in rest), Decimal("0")),
+            "total_expense": sum((Decimal(r["total_expense"]) for r in rest), Decimal("0")),
+            "transaction_count": sum(r["transaction_count"] for r in rest),
+        }
+    )
+    return items
+
+
+def get_dashboard_category_breakdown(
+    transaction_repo: TransactionRepository,
+    user_id: UUID,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    top: int | None = None,
+) -> dict:
+    rows = transaction_repo.category_breakdown(user_id=user_id, start_date=start_date, end_date=end_date)
+    return {"start_date": start_date, "end_date": end_date, "items": _fold_top(rows, top)}
+
+
+async def get_dashboard_category_breakdown_async(
+    transaction_repo,
+    user_id: UUID,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    top: int | None = None,
+) -> dict:
+    rows = await transaction_repo.category_breakdown(user_id=user_id, start_date=start_date, end_date=end_date)
+    return {"start_date": start_date, "end_date": end_date, "items": _fold_top(rows, top)}
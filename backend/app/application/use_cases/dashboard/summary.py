@@ -1,5 +1,6 @@
 ﻿from datetime import date
 from uuid import UUID
+from app.domain.repositories.query_cache import DASHBOARD_SUMMARY_CACHE, QueryCache
 from app.domain.repositories.transaction_repository import TransactionRepository
 
 
@@ -8,5 +9,26 @@ def get_dashboard_summary(
     user_id: UUID,
     start_date: date | None = None,
     end_date: date | None = None,
+    cache: QueryCache | None = None,
 ) -> dict:
-    return transaction_repo.summary(user_id=user_id, start_date=start_date, end_date=end_date)
+    def load():
+        return transaction_repo.summary(user_id=user_id, start_date=start_date, end_date=end_date)
+
+    if cache is None:
+        return load()
+    return cache.get_or_load(DASHBOARD_SUMMARY_CACHE, user_id, (start_date, end_date), load)
+
+
+async def get_dashboard_summary_async(
+    transaction_repo,
+    user_id: UUID,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    cache: QueryCache | None = None,
+) -> dict:
+    async def load():
+        return await transaction_repo.summary(user_id=user_id, start_date=start_date, end_date=end_date)
+
+    if cache is None:
+        return await load()
+    return await cache.get_or_load_async(DASHBOARD_SUMMARY_CACHE, user_id, (start_date, end_date), load)
@@ -0,0 +1,45 @@
+﻿from datetime import date
+from uuid import UUID
+from app.domain.repositories.transaction_repository import TransactionRepository
+
+
+def get_dashboard_timeseries(
+    transaction_repo: TransactionRepository,
+    user_id: UUID,
+    granularity: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> dict:
+    items = transaction_repo.timeseries(
+        user_id=user_id,
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    return {
+        "granularity": granularity,
+        "start_date": start_date,
+        "end_date": end_date,
+        "items": items,
+    }
+
+
+async def get_dashboard_timeseries_async(
+    transaction_repo,
+    user_id: UUID,
+    granularity: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> dict:
+    items = await transaction_repo.timeseries(
+        user_id=user_id,
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    return {
+        "granularity": granularity,
+        "start_date": start_date,
+        "end_date": end_date,
+        "items": items,
+    }
@@ -0,0 +1,64 @@
+﻿from uuid import UUID
+from app.domain.repositories.category_repository import CategoryRepository
+from app.domain.repositories.transaction_repository import TransactionRepository
+
+TRANSACTION_FIELDS = ("category_id", "type", "amount", "description", "date")
+
+
+def apply_transaction_batch(
+    transaction_repo: TransactionRepository,
+    category_repo: CategoryRepository,
+    user_id: UUID,
+    operations: list,
+) -> tuple[list[dict], list[dict]]:
+    # Tudo-ou-nada: qualquer erro de validação impede o lote inteiro.
+    errors = []
+    referenced_ids = [op.id for op in operations if op.op != "create"]
+    existing_ids = transaction_repo.existing_ids(user_id, referenced_ids) if referenced_ids else set()
+    wanted_categories = {op.category_id for op in operations if op.op != "delete" and op.category_id}
+    # Conferência no banco (não no cache por processo, que pode ter uma categoria recém-excluída),
+    # com as categorias travadas até o commit do lote.
+    category_ids = category_repo.lock_ids(user_id, wanted_categories) if wanted_categories else frozenset()
+    seen_ids = set()
+    for index, op in enumerate(operations):
+        if op.op != "create":
+            if op.id in seen_ids:
+                errors.append({"index": index, "message": "Lançamento repetido no lote"})
+                continue
+            seen_ids.add(op.id)
+            if op.id not in existing_ids:
+                errors.append({"index": index, "message": "Lançamento não encontrado"})
+                continue
+        if op.op != "delete" and op.category_id and op.category_id not in category_ids:
+            errors.append({"index": index, "message": "Categoria inválida"})
+    if errors:
+        return [], errors
+
+    creates = [{field: getattr(op, field) for field in TRANSACTION_FIELDS} for op in operations if op.op == "create"]
+    updates = [
+        {"id": op.id, **{field: getattr(op, field) for field in TRANSACTION_FIELDS}}
+        for op in operations
+        if op.op == "update"
+    ]
+    delete_ids = [op.id for op in operations if op.op == "delete"]
+    created, updated, _ = transaction_repo.apply_batch(user_id, creates, updates, delete_ids)
+
+    created = iter(created)
+    updated = {t.id: t for t in updated}
+    results = []
+    for index, op in enumerate(operations):
+        if op.op == "create":
+            transaction = next(created)
+        elif op.op == "update":
+            transaction = updated[op.id]
+        else:
+            transaction = None
+        results.append(
+            {
+                "index": index,
+                "op": op.op,
+                "id": transaction.id if transaction else op.id,
+                "transaction": transaction,
+            }
+        )
+    return results, []
@@ -0,0 +1,122 @@
+﻿import csv
+import json
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+from uuid import UUID
+from pydantic import ValidationError
+from app.application.schemas.transaction import TransactionCreate
+from app.domain.repositories.category_repository import CategoryRepository
+from app.domain.repositories.transaction_repository import TransactionRepository
+
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+# Aceita tanto os nomes da API quanto o cabeçalho gerado pela exportação CSV.
+FIELD_ALIASES = {
+    "categoria_id": "category_id",
+    "tipo": "type",
+    "valor": "amount",
+    "descricao": "description",
+    "data": "date",
+}
+
+
+def detect_import_format(filename: str | None, content_type: str | None) -> str:
+    name = (filename or "").lower()
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if name.endswith((".ndjson", ".jsonl")) or content_type in {"application/x-ndjson", "application/jsonl"}:
+        return "ndjson"
+    if name.endswith(".csv") or content_type in {"text/csv", "application/csv"}:
+        return "csv"
+    raise ValueError("Formato de arquivo não suportado (use CSV ou NDJSON)")
+
+
+def _normalize(record: dict) -> dict:
+    normalized = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = FIELD_ALIASES.get(key.strip(), key.strip())
+        if value == "":
+            value = None
+        normalized[key] = value
+    return normalized
+
+
+def parse_csv(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    reader = csv.DictReader(stream)
+    for record in reader:
+        yield reader.line_num, _normalize(record)
+
+
+def parse_ndjson(stream: TextIO) -> Iterator[tuple[int, dict | str]]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, "JSON inválido"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, "Cada linha deve ser um objeto JSON"
+            continue
+        yield line_number, _normalize(record)
+
+
+def _error_message(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    field = ".".join(str(part) for part in error["loc"])
+    return f"{field}: {error['msg']}" if field else error["msg"]
+
+
+def import_transactions(
+    transaction_repo: TransactionRepository,
+    category_repo: CategoryRepository,
+    user_id: UUID,
+    records: Iterable[tuple[int, dict | str]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict:
+    # Categorias carregadas uma única vez; cada linha é validada contra o set. Uma categoria
+    # excluída durante a importação é pega no banco, sobre as linhas copiadas, depois do COPY.
+    category_ids = category_repo.list_ids_by_user(user_id)
+    errors = []
+    error_count = 0
+
+    def valid_batches():
+        nonlocal error_count
+        iterator = iter(records)
+        while chunk := list(islice(iterator, batch_size)):
+            batch = []
+            for line_number, record in chunk:
+                if isinstance(record, str):
+                    message = record
+                else:
+                    try:
+                        data = TransactionCreate.model_validate(record)
+                    except ValidationError as exc:
+                        message = _error_message(exc)
+                    else:
+                        if data.category_id is None or data.category_id in category_ids:
+                            batch.append(
+                                (line_number, data.category_id, data.type, data.amount, data.description, data.date)
+                            )
+                            continue
+                        message = "Categoria inválida"
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "message": message})
+            # Com erros, nada será gravado: não vale a pena copiar o restante.
+            if batch and not error_count:
+                yield batch
+
+    staged = transaction_repo.stage_import(valid_batches())
+    if not error_count and staged:
+        # Conferência definitiva no banco, com as categorias travadas até o commit.
+        error_count, lines = transaction_repo.invalid_import_lines(user_id, MAX_REPORTED_ERRORS)
+        errors = [{"line": line, "message": "Categoria inválida"} for line in lines]
+    if error_count or not staged:
+        transaction_repo.abort_import()
+        return {"imported": 0, "error_count": error_count, "errors": errors}
+    imported = transaction_repo.commit_import(user_id)
+    return {"imported": imported, "error_count": 0, "errors": []}
@@ -3,6 +3,7 @@ from decimal import Decimal
 from uuid import UUID
 from app.domain.entities.transaction import TransactionType
 from app.domain.repositories.transaction_repository import TransactionRepository
+from app.application.use_cases.transactions.cursor import decode_cursor, encode_cursor
 
 
 def list_transactions(
@@ -22,6 +23,98 @@ def list_transactions(
     )
 
 
+def _split_page(items: list, limit: int):
+    # A consulta busca uma linha extra só para saber se existe próxima página.
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1])
+
+
+def list_transactions_page(
+    transaction_repo: TransactionRepository,
+    user_id: UUID,
+    start_date: date | None,
+    end_date: date | None,
+    type: TransactionType | None,
+    category_id: UUID | None,
+    limit: int,
+    cursor: str | None = None,
+):
+    items = transaction_repo.list_page_by_user(
+        user_id=user_id,
+        limit=limit + 1,
+        after=decode_cursor(cursor) if cursor else None,
+        start_date=start_date,
+        end_date=end_date,
+        type=type,
+        category_id=category_id,
+    )
+    return _split_page(items, limit)
+
+
+def stream_transactions(
+    transaction_repo: TransactionRepository,
+    user_id: UUID,
+    start_date: date | None,
+    end_date: date | None,
+    type: TransactionType | None,
+    category_id: UUID | None,
+    cursor: str | None = None,
+):
+    # O cursor é decodificado já aqui para que um valor inválido falhe antes do streaming.
+    return transaction_repo.iter_by_user(
+        user_id=user_id,
+        after=decode_cursor(cursor) if cursor else None,
+        start_date=start_date,
+        end_date=end_date,
+        type=type,
+        category_id=category_id,
+    )
+
+
+def stream_transactions_async(
+    transaction_repo,
+    user_id: UUID,
+    start_date: date | None,
+    end_date: date | None,
+    type: TransactionType | None,
+    category_id: UUID | None,
+    cursor: str | None = None,
+):
+    # Devolve um gerador assíncrono de lotes; o cursor inválido falha já aqui.
+    return transaction_repo.iter_by_user(
+        user_id=user_id,
+        after=decode_cursor(cursor) if cursor else None,
+        start_date=start_date,
+        end_date=end_date,
+        type=type,
+        category_id=category_id,
+    )
+
+
+async def list_transactions_page_async(
+    transaction_repo,
+    user_id: UUID,
+    start_date: date | None,
+    end_date: date | None,
+    type: TransactionType | None,
+    category_id: UUID | None,
+    limit: int,
+    cursor: str | None = None,
+):
+    items = await transaction_repo.list_page_by_user(
+        user_id=user_id,
+        limit=limit + 1,
+        after=decode_cursor(cursor) if cursor else None,
+        start_date=start_date,
+        end_date=end_date,
+        type=type,
+        category_id=category_id,
+    )
+    return _split_page(items, limit)
+
+
 def create_transaction(
     transaction_repo: TransactionRepository,
     user_id: UUID,
@@ -64,3 +157,47 @@ def update_transaction(
 
 def delete_transaction(transaction_repo: TransactionRepository, user_id: UUID, transaction_id: UUID) -> bool:
     return transaction_repo.delete(transaction_id=transaction_id, user_id=user_id)
+
+
+async def create_transaction_async(
+    transaction_repo,
+    user_id: UUID,
+    category_id: UUID | None,
+    type: TransactionType,
+    amount: Decimal,
+    description: str | None,
+    date: date,
+):
+    return await transaction_repo.create(
+        user_id=user_id,
+        category_id=category_id,
+        type=type,
+        amount=amount,
+        description=description,
+        date=date,
+    )
+
+
+async def update_transaction_async(
+    transaction_repo,
+    user_id: UUID,
+    transaction_id: UUID,
+    category_id: UUID | None,
+    type: TransactionType,
+    amount: Decimal,
+    description: str | None,
+    date: date,
+):
+    return await transaction_repo.update(
+        transaction_id=transaction_id,
+        user_id=user_id,
+        category_id=category_id,
+        type=type,
+        amount=amount,
+        description=description,
+        date=date,
+    )
+
+
+async def delete_transaction_async(transaction_repo, user_id: UUID, transaction_id: UUID) -> bool:
+    return await transaction_repo.delete(transaction_id=transaction_id, user_id=user_id)
@@ -0,0 +1,27 @@
+﻿import base64
+import json
+from datetime import date, datetime
+from uuid import UUID
+from app.domain.entities.transaction import Transaction
+from app.domain.repositories.transaction_repository import TransactionCursor
+
+
+def encode_cursor(transaction: Transaction) -> str:
+    raw = json.dumps(
+        [transaction.date.isoformat(), transaction.created_at.isoformat(), str(transaction.id)],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> TransactionCursor:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        raw_date, raw_created_at, raw_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return TransactionCursor(
+            date=date.fromisoformat(raw_date),
+            created_at=datetime.fromisoformat(raw_created_at),
+            id=UUID(raw_id),
+        )
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
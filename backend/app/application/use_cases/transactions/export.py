@@ -0,0 +1,59 @@
+﻿import io
+from datetime import date
+from uuid import UUID
+from app.domain.entities.transaction import TransactionType
+from app.domain.repositories.transaction_repository import TransactionRepository
+
+EXPORT_HEADER = ["id", "categoria_id", "tipo", "valor", "descricao", "data"]
+EXPORT_CHUNK_SIZE = 64 * 1024
+CSV_SPECIAL_CHARS = frozenset(',"\r\n')
+
+
+def _csv_field(value: str | None) -> str:
+    # Mesmas regras do COPY ... CSV: aspas só com vírgula, aspas, CR ou LF. NULL e texto
+    # vazio saem como campo vazio (o COPY recebe NULLIF(descricao, '')).
+    if not value:
+        return ""
+    if CSV_SPECIAL_CHARS.isdisjoint(value):
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _python_chunks(transaction_repo: TransactionRepository, chunk_size: int, **filters):
+    # Mesmo formato, byte a byte, do motor COPY (fim de linha \n inclusive): trocar
+    # CSV_EXPORT_ENGINE não muda o arquivo.
+    output = io.StringIO()
+    output.write(",".join(EXPORT_HEADER) + "\n")
+    for batch in transaction_repo.iter_export_rows(**filters):
+        # Tamanho conferido a cada linha: uma partição do cursor inteira passaria bem de chunk_size.
+        for id_, category_id, type_, amount, description, date_ in batch:
+            output.write(
+                f"{id_},{category_id or ''},{type_.value},{amount:.2f},{_csv_field(description)},{date_.isoformat()}\n"
+            )
+            if output.tell() >= chunk_size:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+    yield output.getvalue()
+
+
+def export_transactions_csv(
+    transaction_repo: TransactionRepository,
+    user_id: UUID,
+    start_date: date | None,
+    end_date: date | None,
+    type: TransactionType | None,
+    category_id: UUID | None,
+    engine: str = "copy",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+):
+    filters = {
+        "user_id": user_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "type": type,
+        "category_id": category_id,
+    }
+    if engine == "copy":
+        return transaction_repo.copy_export_csv(chunk_size=chunk_size, **filters)
+    return _python_chunks(transaction_repo, chunk_size, **filters)
@@ -1,6 +1,7 @@
 ﻿import logging
 import sys
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,15 +23,51 @@ class Settings(BaseSettings):
     postgres_port: int = 5432
     postgres_db: str
 
+    # "transaction": modo compatível com pgbouncer (NullPool, sem prepared statements).
+    db_pool_mode: Literal["session", "transaction"] = "session"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
     allowed_origins: str = "http://localhost:5173"
     environment: str = "development"
     auto_create_db: bool = True
     enable_csv_export: bool = True
+    # "copy": CSV gerado pelo Postgres (COPY TO STDOUT); "python": csv.writer sobre cursor no servidor.
+    csv_export_engine: Literal["copy", "python"] = "copy"
+    db_async: bool = False
+    # Respostas com orjson; listagens pulam a revalidação do response_model.
+    fast_json: bool = False
+    # Compressão das respostas: gzip sempre, Brotli quando o pacote estiver instalado.
+    enable_compression: bool = True
+    compression_minimum_size: int = 1000
+    compression_level: int = 6
+    brotli_quality: int = 4
+    # Instrumentação por requisição: cabeçalho Server-Timing e log com o SQL das lentas.
+    server_timing: bool = True
+    slow_request_ms: int = 1000
+    # Endpoint /metrics no formato do Prometheus.
+    enable_metrics: bool = True
     demo_mode: bool = False
     enable_default_categories: bool = False
     demo_email: str = "demo@empresa.com"
     demo_password: str = "demo123"
 
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: int = 60
+
+    # Cache do resumo do dashboard e da lista de categorias. "redis" requer o pacote redis.
+    query_cache_backend: Literal["memory", "redis"] = "memory"
+    query_cache_size: int = 10000
+    query_cache_ttl_seconds: int = 300
+    redis_url: str = "redis://localhost:6379/0"
+
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 16
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
 
     @property
@@ -0,0 +1,69 @@
+﻿import heapq
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Comandos SQL mais lentos guardados por requisição para o log de requisições lentas.
+MAX_RECORDED_STATEMENTS = 10
+
+
+class RequestStats:
+    # Custos acumulados de uma requisição. O objeto é compartilhado com as threads do
+    # threadpool (o contexto é copiado, a referência é a mesma).
+    __slots__ = ("started", "statements", "db_seconds", "mapping_seconds", "serialization_seconds", "_slowest")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.mapping_seconds = 0.0
+        self.serialization_seconds = 0.0
+        # Heap de mínimo (segundos, ordem, comando): só os mais lentos ficam, em memória
+        # constante mesmo num N+1 com milhares de comandos.
+        self._slowest = []
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        entry = (seconds, self.statements, statement)
+        if len(self._slowest) < MAX_RECORDED_STATEMENTS:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_statements(self) -> list[tuple[float, str]]:
+        # (segundos, comando), do mais lento para o mais rápido.
+        return [(seconds, statement) for seconds, _, statement in sorted(self._slowest, reverse=True)]
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def start_request() -> tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+@contextmanager
+def timed(field: str):
+    # Soma a duração do bloco em RequestStats.<field> ("mapping_seconds" ou "serialization_seconds").
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(stats, field, getattr(stats, field) + time.perf_counter() - started)
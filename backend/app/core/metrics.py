@@ -0,0 +1,146 @@
+﻿import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Métricas expostas em /metrics, na ordem de criação.
+_registry: list = []
+# Funções chamadas a cada coleta para valores lidos de outros objetos (pool, caches...).
+# Cada uma devolve [(nome, tipo, descrição, [(labels, valor), ...]), ...].
+_collectors: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> list:
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        # labels -> [contagem por bucket..., soma, total]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self, **labels) -> dict:
+        with self._lock:
+            state = self._values.get(tuple(sorted(labels.items())))
+            if state is None:
+                return {"buckets": dict.fromkeys(self.buckets, 0), "sum": 0.0, "count": 0}
+            return {
+                "buckets": dict(zip(self.buckets, state[: len(self.buckets)])),
+                "sum": state[-2],
+                "count": state[-1],
+            }
+
+    def samples(self) -> list:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        samples = []
+        for key, state in items:
+            # Os buckets já são cumulativos: observe conta o valor em todos os limites >= valor.
+            for bound, count in zip(self.buckets + (float("inf"),), state[: len(self.buckets)] + [state[-1]]):
+                samples.append((f"{self.name}_bucket", key + (("le", _format_value(float(bound))),), count))
+            samples.append((f"{self.name}_sum", key, state[-2]))
+            samples.append((f"{self.name}_count", key, state[-1]))
+        return samples
+
+
+def register_collector(collector) -> None:
+    _collectors.append(collector)
+
+
+def render_prometheus() -> str:
+    # Formato texto de exposição do Prometheus (version=0.0.4).
+    families = [(metric.name, metric.type, metric.documentation, metric.samples()) for metric in _registry]
+    for collector in _collectors:
+        for name, type_, documentation, values in collector():
+            families.append((name, type_, documentation, [(name, tuple(labels), value) for labels, value in values]))
+    lines = []
+    for name, type_, documentation, samples in families:
+        # Contadores seguem a convenção do Prometheus: a família não leva o sufixo _total.
+        family = name.removesuffix("_total") if type_ == "counter" else name
+        lines.append(f"# HELP {family} {documentation}")
+        lines.append(f"# TYPE {family} {type_}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tempo aguardando uma conexão livre no pool do banco.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts que estouraram DB_POOL_TIMEOUT.",
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP por método, rota e status.",
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requisições HTTP em andamento.",
+)
+export_bytes_streamed = Counter(
+    "export_bytes_streamed_total",
+    "Bytes enviados pelas exportações em streaming (CSV e NDJSON).",
+)
@@ -10,7 +10,7 @@ class CategoryType(str, Enum):
     BOTH = "both"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Category:
     id: UUID
     user_id: UUID
@@ -18,3 +18,13 @@ class Category:
     type: CategoryType
     created_at: datetime
     updated_at: datetime
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "name": self.name,
+            "type": self.type,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
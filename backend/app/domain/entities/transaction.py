@@ -10,7 +10,7 @@ class TransactionType(str, Enum):
     EXPENSE = "expense"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Transaction:
     id: UUID
     user_id: UUID
@@ -21,3 +21,16 @@ class Transaction:
     date: date
     created_at: datetime
     updated_at: datetime
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "category_id": self.category_id,
+            "type": self.type,
+            "amount": self.amount,
+            "description": self.description,
+            "date": self.date,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
@@ -3,10 +3,19 @@ from datetime import datetime
 from uuid import UUID
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class User:
     id: UUID
     email: str
     hashed_password: str
     is_active: bool
     created_at: datetime
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "email": self.email,
+            "hashed_password": self.hashed_password,
+            "is_active": self.is_active,
+            "created_at": self.created_at,
+        }
@@ -1,5 +1,5 @@
 ﻿from datetime import datetime
-from typing import Protocol
+from typing import Iterable, Protocol
 from uuid import UUID
 from app.domain.entities.category import Category, CategoryType
 
@@ -8,6 +8,12 @@ class CategoryRepository(Protocol):
     def list_by_user(self, user_id: UUID) -> list[Category]:
         ...
 
+    def list_ids_by_user(self, user_id: UUID) -> set[UUID]:
+        ...
+
+    def lock_ids(self, user_id: UUID, category_ids: Iterable[UUID]) -> frozenset[UUID]:
+        ...
+
     def get_by_id(self, category_id: UUID, user_id: UUID) -> Category | None:
         ...
 
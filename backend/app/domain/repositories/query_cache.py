@@ -0,0 +1,19 @@
+﻿from typing import Any, Awaitable, Callable, Hashable, Protocol
+from uuid import UUID
+
+# Namespaces do cache de consultas; as escritas invalidam o namespace afetado por usuário.
+DASHBOARD_SUMMARY_CACHE = "dashboard_summary"
+CATEGORIES_CACHE = "categories"
+
+
+class QueryCache(Protocol):
+    def get_or_load(self, namespace: str, user_id: UUID, params: Hashable, load: Callable[[], Any]) -> Any:
+        ...
+
+    async def get_or_load_async(
+        self, namespace: str, user_id: UUID, params: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        ...
+
+    def invalidate(self, user_id: UUID, *namespaces: str) -> None:
+        ...
@@ -1,10 +1,18 @@
-﻿from datetime import date
+﻿from dataclasses import dataclass
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Protocol
+from typing import Iterable, Iterator, Protocol
 from uuid import UUID
 from app.domain.entities.transaction import Transaction, TransactionType
 
 
+@dataclass(frozen=True)
+class TransactionCursor:
+    date: date
+    created_at: datetime
+    id: UUID
+
+
 class TransactionRepository(Protocol):
     def list_by_user(
         self,
@@ -16,6 +24,76 @@ class TransactionRepository(Protocol):
     ) -> list[Transaction]:
         ...
 
+    def list_page_by_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        type: TransactionType | None = None,
+        category_id: UUID | None = None,
+    ) -> list[Transaction]:
+        ...
+
+    def iter_by_user(
+        self,
+        user_id: UUID,
+        after: TransactionCursor | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        type: TransactionType | None = None,
+        category_id: UUID | None = None,
+        batch_size: int = 2000,
+    ) -> Iterator[list[Transaction]]:
+        ...
+
+    def iter_export_rows(
+        self,
+        user_id: UUID,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        type: TransactionType | None = None,
+        category_id: UUID | None = None,
+        batch_size: int = 2000,
+    ) -> Iterator[list[tuple]]:
+        ...
+
+    def copy_export_csv(
+        self,
+        user_id: UUID,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        type: TransactionType | None = None,
+        category_id: UUID | None = None,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        ...
+
+    def stage_import(self, batches: Iterable[list[tuple]]) -> int:
+        ...
+
+    def invalid_import_lines(self, user_id: UUID, limit: int) -> tuple[int, list[int]]:
+        ...
+
+    def commit_import(self, user_id: UUID) -> int:
+        ...
+
+    def abort_import(self) -> None:
+        ...
+
+    def existing_ids(self, user_id: UUID, transaction_ids: Iterable[UUID]) -> set[UUID]:
+        ...
+
+    def apply_batch(
+        self,
+        user_id: UUID,
+        creates: list[dict],
+        updates: list[dict],
+        delete_ids: list[UUID],
+    ) -> tuple[list[Transaction], list[Transaction], list[Transaction]]:
+        ...
+
     def get_by_id(self, transaction_id: UUID, user_id: UUID) -> Transaction | None:
         ...
 
@@ -27,7 +105,7 @@ class TransactionRepository(Protocol):
         amount: Decimal,
         description: str | None,
         date: date,
-    ) -> Transaction:
+    ) -> Transaction | None:
         ...
 
     def update(
@@ -52,3 +130,20 @@ class TransactionRepository(Protocol):
         end_date: date | None = None,
     ) -> dict:
         ...
+
+    def timeseries(
+        self,
+        user_id: UUID,
+        granularity: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[dict]:
+        ...
+
+    def category_breakdown(
+        self,
+        user_id: UUID,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[dict]:
+        ...
@@ -10,5 +10,14 @@ class UserRepository(Protocol):
     def get_by_id(self, user_id: UUID) -> User | None:
         ...
 
-    def create(self, email: str, hashed_password: str) -> User:
+    def get_data_version(self, user_id: UUID) -> int | None:
+        ...
+
+    def create(self, email: str, hashed_password: str) -> User | None:
+        ...
+
+    def update_password(self, user_id: UUID, hashed_password: str) -> User | None:
+        ...
+
+    def set_active(self, user_id: UUID, is_active: bool) -> User | None:
         ...
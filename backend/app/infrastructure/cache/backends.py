@@ -0,0 +1,57 @@
+﻿import pickle
+import threading
+from app.infrastructure.cache.lru import TTLLRUCache
+
+
+class MemoryCacheBackend:
+    # LRU do processo, limitado por tamanho e com TTL. Os valores ficam como objetos.
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._cache = TTLLRUCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, nx: bool = False) -> bool:
+        if not nx:
+            self._cache.set(key, value)
+            return True
+        with self._lock:
+            if self._cache.get(key) is not None:
+                return False
+            self._cache.set(key, value)
+            return True
+
+    def delete(self, key) -> None:
+        self._cache.delete(key)
+
+
+class RedisCacheBackend:
+    # Qualquer cliente compatível com redis-py (get/set/delete); compartilhado entre
+    # processos. O limite de tamanho fica com o maxmemory do próprio Redis.
+    blocking = True
+
+    def __init__(self, client, ttl_seconds: int, prefix: str = "query_cache:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, nx: bool = False) -> bool:
+        return bool(self.client.set(self.prefix + key, pickle.dumps(value), ex=self.ttl_seconds, nx=nx))
+
+    def delete(self, key) -> None:
+        self.client.delete(self.prefix + key)
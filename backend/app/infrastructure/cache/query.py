@@ -0,0 +1,119 @@
+﻿import asyncio
+import threading
+import uuid
+from app.core.metrics import Counter
+
+query_cache_requests = Counter(
+    "query_cache_requests_total",
+    "Consultas ao cache por namespace e resultado (hit, miss, coalesced).",
+)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class QueryCache:
+    # Resultados de consultas por usuário e parâmetros. Cada (namespace, usuário) tem
+    # uma geração aleatória que entra na chave: invalidar é apagar a geração, e as
+    # entradas antigas ficam inalcançáveis até expirarem. Cargas concorrentes da mesma
+    # chave no processo rodam uma única consulta (single-flight).
+    def __init__(self, backend):
+        self.backend = backend
+        self._flights: dict[str, _Flight] = {}
+        self._async_flights: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _generation_key(namespace: str, user_id) -> str:
+        return f"gen:{namespace}:{user_id}"
+
+    def _key(self, namespace: str, user_id, params) -> str:
+        generation_key = self._generation_key(namespace, user_id)
+        generation = self.backend.get(generation_key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            if not self.backend.set(generation_key, generation, nx=True):
+                generation = self.backend.get(generation_key) or generation
+        return f"{namespace}:{user_id}:{generation}:{params!r}"
+
+    def _lookup(self, namespace: str, user_id, params):
+        key = self._key(namespace, user_id, params)
+        return key, self.backend.get(key)
+
+    def get_or_load(self, namespace: str, user_id, params, load):
+        if not self.backend.enabled:
+            return load()
+        key, value = self._lookup(namespace, user_id, params)
+        if value is not None:
+            query_cache_requests.inc(namespace=namespace, result="hit")
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if not flight.failed:
+                query_cache_requests.inc(namespace=namespace, result="coalesced")
+                return flight.value
+            return load()
+        query_cache_requests.inc(namespace=namespace, result="miss")
+        try:
+            flight.value = load()
+            self.backend.set(key, flight.value)
+            return flight.value
+        except BaseException:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def _run(self, function, *args):
+        # Backends remotos não bloqueiam o event loop.
+        if self.backend.blocking:
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
+
+    async def get_or_load_async(self, namespace: str, user_id, params, load):
+        if not self.backend.enabled:
+            return await load()
+        key, value = await self._run(self._lookup, namespace, user_id, params)
+        if value is not None:
+            query_cache_requests.inc(namespace=namespace, result="hit")
+            return value
+        flight = self._async_flights.get(key)
+        if flight is not None:
+            # O resultado do líder é (ok, valor); se a carga dele falhou, cada um tenta a sua.
+            ok, value = await asyncio.shield(flight)
+            if not ok:
+                return await load()
+            query_cache_requests.inc(namespace=namespace, result="coalesced")
+            return value
+        flight = self._async_flights[key] = asyncio.get_running_loop().create_future()
+        query_cache_requests.inc(namespace=namespace, result="miss")
+        result = (False, None)
+        try:
+            value = await load()
+            await self._run(self.backend.set, key, value)
+            result = (True, value)
+            return value
+        finally:
+            del self._async_flights[key]
+            flight.set_result(result)
+
+    def invalidate(self, user_id, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.backend.delete(self._generation_key(namespace, user_id))
+
+    def hit_rate(self, namespace: str) -> float:
+        hits = query_cache_requests.value(namespace=namespace, result="hit")
+        hits += query_cache_requests.value(namespace=namespace, result="coalesced")
+        total = hits + query_cache_requests.value(namespace=namespace, result="miss")
+        return hits / total if total else 0.0
@@ -0,0 +1,18 @@
+﻿from app.core.config import get_settings
+from app.infrastructure.cache.backends import MemoryCacheBackend, RedisCacheBackend
+from app.infrastructure.cache.query import QueryCache
+
+settings = get_settings()
+
+
+def _backend():
+    if settings.query_cache_backend == "redis":
+        import redis  # dependência opcional, só com QUERY_CACHE_BACKEND=redis
+
+        return RedisCacheBackend(redis.Redis.from_url(settings.redis_url), settings.query_cache_ttl_seconds)
+    return MemoryCacheBackend(maxsize=settings.query_cache_size, ttl_seconds=settings.query_cache_ttl_seconds)
+
+
+# Resultados do resumo do dashboard e da lista de categorias, invalidados pelas
+# escritas dos repositórios de lançamentos e categorias.
+query_cache = QueryCache(_backend())
@@ -0,0 +1,8 @@
+﻿from app.core.config import get_settings
+from app.infrastructure.cache.lru import TTLLRUCache
+
+settings = get_settings()
+
+# Usuários autenticados, por id. Cada worker tem o seu cache; o TTL limita por
+# quanto tempo outro processo pode enxergar um usuário desatualizado.
+user_cache = TTLLRUCache(maxsize=settings.user_cache_size, ttl_seconds=settings.user_cache_ttl_seconds)
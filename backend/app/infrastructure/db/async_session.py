@@ -0,0 +1,17 @@
+﻿from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.core.config import get_settings
+from app.infrastructure.db.instrumentation import instrument_engine
+from app.infrastructure.db.pool import engine_options
+
+settings = get_settings()
+
+# Mesmo driver (psycopg 3) em modo assíncrono; usado quando DB_ASYNC=true.
+async_engine = create_async_engine(settings.database_url, **engine_options(is_async=True))
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,21 @@
+﻿import time
+from sqlalchemy import event
+from app.core.instrumentation import current_stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._instrumentation_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    started = getattr(context, "_instrumentation_started", None)
+    if stats is not None and started is not None:
+        stats.record_statement(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    # Quantidade e tempo dos comandos SQL de cada requisição (ver app.core.instrumentation).
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,5 +1,6 @@
 ﻿from app.infrastructure.db.models.user_model import UserModel
 from app.infrastructure.db.models.category_model import CategoryModel
 from app.infrastructure.db.models.transaction_model import TransactionModel
+from app.infrastructure.db.models.daily_balance_model import DailyBalanceModel
 
-__all__ = ["UserModel", "CategoryModel", "TransactionModel"]
+__all__ = ["UserModel", "CategoryModel", "TransactionModel", "DailyBalanceModel"]
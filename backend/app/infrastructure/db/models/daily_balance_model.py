@@ -0,0 +1,28 @@
+﻿from sqlalchemy import BigInteger, Column, Date, Enum, ForeignKey, Index, Integer, Numeric, func, literal_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.domain.entities.transaction import TransactionType
+from app.infrastructure.db.base import Base
+
+NO_CATEGORY_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def category_key(column):
+    # category_id é opcional; o coalesce permite usá-lo na chave única do rollup.
+    return func.coalesce(column, literal_column(f"'{NO_CATEGORY_UUID}'::uuid"))
+
+
+class DailyBalanceModel(Base):
+    __tablename__ = "daily_balances"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    type = Column(Enum(TransactionType, name="transaction_type"), nullable=False)
+    # Sem FK: ao excluir uma categoria os totais são movidos para "sem categoria".
+    category_id = Column(UUID(as_uuid=True), nullable=True)
+    amount_total = Column(Numeric(18, 2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("uq_daily_balances_key", user_id, date, type, category_key(category_id), unique=True),
+    )
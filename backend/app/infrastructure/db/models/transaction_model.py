@@ -1,5 +1,5 @@
 ﻿import uuid
-from sqlalchemy import Column, Date, DateTime, Enum, ForeignKey, Numeric, String, func
+from sqlalchemy import Column, Date, DateTime, Enum, ForeignKey, Index, Numeric, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from app.domain.entities.transaction import TransactionType
 from app.infrastructure.db.base import Base
@@ -17,3 +17,8 @@ class TransactionModel(Base):
     date = Column(Date, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_transactions_user_date_created", user_id, date.desc(), created_at.desc(), id.desc()),
+        Index("ix_transactions_user_type_date", user_id, type, date, postgresql_include=["amount"]),
+    )
@@ -1,5 +1,5 @@
 ﻿import uuid
-from sqlalchemy import Boolean, Column, DateTime, String, func
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from app.infrastructure.db.base import Base
 
@@ -12,3 +12,5 @@ class UserModel(Base):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Incrementado a cada escrita em lançamentos ou categorias do usuário (ETags das leituras).
+    data_version = Column(BigInteger, nullable=False, server_default="0")
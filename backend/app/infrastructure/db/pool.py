@@ -0,0 +1,48 @@
+﻿import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.core.config import get_settings
+from app.core.metrics import db_pool_checkout_timeouts, db_pool_checkout_wait_seconds
+
+settings = get_settings()
+
+
+class _TimedCheckout:
+    # Mede quanto tempo cada checkout espera por uma conexão do pool.
+    engine_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            db_pool_checkout_timeouts.inc(engine=self.engine_label)
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - started, engine=self.engine_label)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    engine_label = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def engine_options(is_async: bool = False) -> dict:
+    if settings.db_pool_mode == "transaction":
+        # Atrás do pgbouncer em pool_mode=transaction: o pooling fica com o
+        # pgbouncer e prepared statements não sobrevivem entre transações.
+        return {
+            "poolclass": NullPool,
+            "connect_args": {"prepare_threshold": None},
+        }
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
@@ -0,0 +1,158 @@
+﻿import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.db.repositories.category_repository_impl import CategoryRepositoryImpl
+from app.infrastructure.db.repositories.mappers import map_rows, transaction_row_to_entity
+from app.infrastructure.db.repositories.transaction_repository_impl import TransactionRepositoryImpl
+from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
+
+
+class _AsyncRepository:
+    # Executa a implementação síncrona via AsyncSession.run_sync: as consultas são
+    # as mesmas, mas o I/O passa pela conexão assíncrona sem bloquear o event loop.
+    sync_repository = None
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        def call(session):
+            return getattr(self.sync_repository(session), method)(*args, **kwargs)
+
+        return await self.db.run_sync(call)
+
+
+class ThreadedRepository:
+    # Repositório síncrono com métodos aguardáveis: cada chamada roda numa thread e a
+    # requisição não fica presa a uma thread enquanto aguarda outra coisa (ex.: bcrypt).
+    def __init__(self, repository):
+        self._repository = repository
+
+    def __getattr__(self, name: str):
+        method = getattr(self._repository, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+
+class AsyncUserRepositoryImpl(_AsyncRepository):
+    sync_repository = UserRepositoryImpl
+
+    async def get_by_email(self, email: str):
+        return await self._run("get_by_email", email)
+
+    async def get_by_id(self, user_id):
+        return await self._run("get_by_id", user_id)
+
+    async def get_data_version(self, user_id):
+        return await self._run("get_data_version", user_id)
+
+    async def create(self, email: str, hashed_password: str):
+        return await self._run("create", email=email, hashed_password=hashed_password)
+
+    async def update_password(self, user_id, hashed_password: str):
+        return await self._run("update_password", user_id, hashed_password)
+
+    async def set_active(self, user_id, is_active: bool):
+        return await self._run("set_active", user_id, is_active)
+
+
+class AsyncCategoryRepositoryImpl(_AsyncRepository):
+    sync_repository = CategoryRepositoryImpl
+
+    async def list_by_user(self, user_id):
+        return await self._run("list_by_user", user_id)
+
+    async def lock_ids(self, user_id, category_ids):
+        return await self._run("lock_ids", user_id, category_ids)
+
+    async def get_by_id(self, category_id, user_id):
+        return await self._run("get_by_id", category_id, user_id)
+
+    async def create(self, user_id, name, type):
+        return await self._run("create", user_id=user_id, name=name, type=type)
+
+    async def update(self, category_id, user_id, name, type):
+        return await self._run("update", category_id=category_id, user_id=user_id, name=name, type=type)
+
+    async def delete(self, category_id, user_id) -> bool:
+        return await self._run("delete", category_id=category_id, user_id=user_id)
+
+
+class AsyncTransactionRepositoryImpl(_AsyncRepository):
+    sync_repository = TransactionRepositoryImpl
+
+    async def list_by_user(self, user_id, start_date=None, end_date=None, type=None, category_id=None):
+        return await self._run("list_by_user", user_id, start_date, end_date, type, category_id)
+
+    async def list_page_by_user(
+        self, user_id, limit, after=None, start_date=None, end_date=None, type=None, category_id=None
+    ):
+        return await self._run(
+            "list_page_by_user",
+            user_id=user_id,
+            limit=limit,
+            after=after,
+            start_date=start_date,
+            end_date=end_date,
+            type=type,
+            category_id=category_id,
+        )
+
+    async def iter_by_user(
+        self,
+        user_id,
+        after=None,
+        start_date=None,
+        end_date=None,
+        type=None,
+        category_id=None,
+        batch_size: int = 2000,
+    ):
+        # Cursor no servidor pela própria conexão assíncrona (AsyncSession.stream): cada
+        # lote é aguardado sem bloquear o event loop nem ocupar uma thread.
+        stmt = self.sync_repository(self.db.sync_session).stream_statement(
+            user_id, after, start_date, end_date, type, category_id
+        )
+        result = await self.db.stream(stmt, execution_options={"yield_per": batch_size})
+        async for partition in result.partitions():
+            yield map_rows(partition, transaction_row_to_entity)
+
+    async def get_by_id(self, transaction_id, user_id):
+        return await self._run("get_by_id", transaction_id, user_id)
+
+    async def create(self, user_id, category_id, type, amount, description, date):
+        return await self._run(
+            "create",
+            user_id=user_id,
+            category_id=category_id,
+            type=type,
+            amount=amount,
+            description=description,
+            date=date,
+        )
+
+    async def update(self, transaction_id, user_id, category_id, type, amount, description, date):
+        return await self._run(
+            "update",
+            transaction_id=transaction_id,
+            user_id=user_id,
+            category_id=category_id,
+            type=type,
+            amount=amount,
+            description=description,
+            date=date,
+        )
+
+    async def delete(self, transaction_id, user_id) -> bool:
+        return await self._run("delete", transaction_id=transaction_id, user_id=user_id)
+
+    async def summary(self, user_id, start_date=None, end_date=None) -> dict:
+        return await self._run("summary", user_id, start_date, end_date)
+
+    async def category_breakdown(self, user_id, start_date=None, end_date=None) -> list[dict]:
+        return await self._run("category_breakdown", user_id, start_date, end_date)
+
+    async def timeseries(self, user_id, granularity, start_date=None, end_date=None) -> list[dict]:
+        return await self._run("timeseries", user_id, granularity, start_date, end_date)
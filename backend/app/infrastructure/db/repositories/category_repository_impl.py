@@ -1,9 +1,18 @@
-﻿from sqlalchemy import select
+﻿from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.orm import Session
 from app.domain.entities.category import CategoryType
 from app.domain.repositories.category_repository import CategoryRepository
+from app.domain.repositories.query_cache import CATEGORIES_CACHE
+from app.infrastructure.cache.query_cache import query_cache
 from app.infrastructure.db.models.category_model import CategoryModel
-from app.infrastructure.db.repositories.mappers import category_model_to_entity
+from app.infrastructure.db.repositories.daily_balance_repository_impl import DailyBalanceRepositoryImpl
+from app.infrastructure.db.repositories.mappers import (
+    CATEGORY_COLUMNS,
+    category_model_to_entity,
+    category_row_to_entity,
+    map_rows,
+)
+from app.infrastructure.db.repositories.user_repository_impl import bump_data_version
 
 
 class CategoryRepositoryImpl(CategoryRepository):
@@ -11,47 +20,66 @@ class CategoryRepositoryImpl(CategoryRepository):
         self.db = db
 
     def list_by_user(self, user_id):
-        stmt = select(CategoryModel).where(CategoryModel.user_id == user_id).order_by(CategoryModel.name.asc())
-        models = self.db.execute(stmt).scalars().all()
-        return [category_model_to_entity(model) for model in models]
+        stmt = select(*CATEGORY_COLUMNS).where(CategoryModel.user_id == user_id).order_by(CategoryModel.name.asc())
+        return map_rows(self.db.execute(stmt), category_row_to_entity)
+
+    def list_ids_by_user(self, user_id):
+        stmt = select(CategoryModel.id).where(CategoryModel.user_id == user_id)
+        return set(self.db.execute(stmt).scalars())
+
+    def lock_ids(self, user_id, category_ids):
+        # Conferência definitiva de posse antes de uma escrita: FOR KEY SHARE impede que as
+        # categorias sejam excluídas até o commit da transação que as referencia.
+        stmt = (
+            select(CategoryModel.id)
+            .where(CategoryModel.user_id == user_id, CategoryModel.id.in_(category_ids))
+            .with_for_update(read=True, key_share=True)
+        )
+        return frozenset(self.db.execute(stmt).scalars())
 
     def get_by_id(self, category_id, user_id):
-        stmt = select(CategoryModel).where(
+        stmt = select(*CATEGORY_COLUMNS).where(
             CategoryModel.id == category_id,
             CategoryModel.user_id == user_id,
         )
-        model = self.db.execute(stmt).scalars().first()
-        return category_model_to_entity(model) if model else None
+        row = self.db.execute(stmt).first()
+        return category_row_to_entity(row) if row else None
 
     def create(self, user_id, name: str, type: CategoryType):
-        model = CategoryModel(user_id=user_id, name=name, type=type)
-        self.db.add(model)
+        table = CategoryModel.__table__
+        inserted = insert(table).values(user_id=user_id, name=name, type=type).returning(*table.c).cte("inserted")
+        row = self.db.execute(select(inserted).add_cte(bump_data_version(user_id, inserted))).one()
         self.db.commit()
-        self.db.refresh(model)
-        return category_model_to_entity(model)
+        query_cache.invalidate(user_id, CATEGORIES_CACHE)
+        return category_model_to_entity(row)
 
     def update(self, category_id, user_id, name: str, type: CategoryType):
-        stmt = select(CategoryModel).where(
-            CategoryModel.id == category_id,
-            CategoryModel.user_id == user_id,
+        table = CategoryModel.__table__
+        updated = (
+            update(table)
+            .where(table.c.id == category_id, table.c.user_id == user_id)
+            .values(name=name, type=type)
+            .returning(*table.c)
+            .cte("updated")
         )
-        model = self.db.execute(stmt).scalars().first()
-        if not model:
-            return None
-        model.name = name
-        model.type = type
+        row = self.db.execute(select(updated).add_cte(bump_data_version(user_id, updated))).first()
         self.db.commit()
-        self.db.refresh(model)
-        return category_model_to_entity(model)
+        if row:
+            query_cache.invalidate(user_id, CATEGORIES_CACHE)
+        return category_model_to_entity(row) if row else None
 
     def delete(self, category_id, user_id) -> bool:
-        stmt = select(CategoryModel).where(
-            CategoryModel.id == category_id,
-            CategoryModel.user_id == user_id,
+        table = CategoryModel.__table__
+        deleted = (
+            delete(table)
+            .where(table.c.id == category_id, table.c.user_id == user_id)
+            .returning(table.c.id)
+            .cte("deleted_category")
         )
-        model = self.db.execute(stmt).scalars().first()
-        if not model:
-            return False
-        self.db.delete(model)
+        detach = DailyBalanceRepositoryImpl(self.db).detach_category_ctes(user_id, category_id)
+        version = bump_data_version(user_id, deleted)
+        count = self.db.execute(select(func.count()).select_from(deleted).add_cte(*detach, version)).scalar_one()
         self.db.commit()
-        return True
+        if count:
+            query_cache.invalidate(user_id, CATEGORIES_CACHE)
+        return count > 0
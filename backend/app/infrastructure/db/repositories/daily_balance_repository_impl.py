@@ -0,0 +1,289 @@
+﻿from decimal import Decimal
+from sqlalchemy import Date, case, delete, exists, func, literal, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.domain.entities.transaction import TransactionType
+from app.domain.repositories.query_cache import DASHBOARD_SUMMARY_CACHE
+from app.infrastructure.cache.query_cache import query_cache
+from app.infrastructure.db.models.category_model import CategoryModel
+from app.infrastructure.db.models.daily_balance_model import DailyBalanceModel, category_key
+from app.infrastructure.db.models.transaction_model import TransactionModel
+from app.infrastructure.db.models.user_model import UserModel
+
+# Chave do advisory lock das reconstruções: exclusivo na completa, compartilhado nas por usuário.
+REBUILD_LOCK_KEY = 7_423_001
+REBUILD_ATTEMPTS = 3
+ROLLUP_KEY = [
+    DailyBalanceModel.user_id,
+    DailyBalanceModel.date,
+    DailyBalanceModel.type,
+    category_key(DailyBalanceModel.category_id),
+]
+
+
+def _insert_from(source):
+    return _upsert(
+        insert(DailyBalanceModel).from_select(
+            ["user_id", "date", "type", "category_id", "amount_total", "transaction_count"],
+            source,
+        )
+    )
+
+
+def _upsert(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=ROLLUP_KEY,
+        set_={
+            "amount_total": DailyBalanceModel.amount_total + stmt.excluded.amount_total,
+            "transaction_count": DailyBalanceModel.transaction_count + stmt.excluded.transaction_count,
+        },
+    )
+
+
+class DailyBalanceRepositoryImpl:
+    # Rollup diário de transactions. As escritas não fazem commit: rodam na
+    # mesma transação da alteração em transactions/categories.
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_cte(self, source, name: str = "daily_balance_delta"):
+        # Versão CTE do upsert: entra no mesmo comando do INSERT/UPDATE/DELETE em
+        # transactions, sem ida e volta extra ao banco. O RETURNING traz a linha resultante
+        # para emptied_dates achar os dias que ficaram zerados.
+        return (
+            _insert_from(source)
+            .returning(DailyBalanceModel.date, DailyBalanceModel.transaction_count)
+            .cte(name)
+        )
+
+    def emptied_dates(self, rollup):
+        # Subconsulta com as datas que o upsert zerou (NULL se nenhuma): o DELETE não pode
+        # ir no mesmo comando, que não enxerga as linhas escritas pela própria CTE.
+        return (
+            select(func.array_agg(rollup.c.date))
+            .where(rollup.c.transaction_count == 0)
+            .scalar_subquery()
+        )
+
+    def prune_days(self, user_id, dates) -> None:
+        # Comando extra só quando a escrita zerou algum dia, na mesma transação.
+        if dates:
+            self.db.execute(
+                delete(DailyBalanceModel).where(
+                    DailyBalanceModel.user_id == user_id,
+                    DailyBalanceModel.date.in_(dates),
+                    DailyBalanceModel.transaction_count == 0,
+                )
+            )
+
+    def apply_many(self, deltas) -> None:
+        # deltas: (user_id, date, type, category_id, valor, contagem). Agrega por chave
+        # antes do upsert: ON CONFLICT não aceita a mesma chave duas vezes no mesmo INSERT.
+        totals: dict[tuple, list] = {}
+        for user_id, date, type, category_id, amount, count in deltas:
+            total = totals.setdefault((user_id, date, type, category_id), [Decimal(0), 0])
+            total[0] += amount
+            total[1] += count
+        rows = [
+            {
+                "user_id": user_id,
+                "date": date,
+                "type": type,
+                "category_id": category_id,
+                "amount_total": amount,
+                "transaction_count": count,
+            }
+            for (user_id, date, type, category_id), (amount, count) in totals.items()
+            if amount or count
+        ]
+        if rows:
+            self.db.execute(_upsert(insert(DailyBalanceModel).values(rows)))
+            self.prune({row["user_id"] for row in rows})
+
+    def prune(self, user_ids=None) -> None:
+        # Remove os dias que ficaram sem lançamentos (contagem zerada por exclusões e
+        # edições). Seguro com escritas concorrentes: uma linha incrementada nesse meio
+        # tempo deixa de atender ao filtro e não é apagada.
+        stmt = delete(DailyBalanceModel).where(DailyBalanceModel.transaction_count == 0)
+        if user_ids is not None:
+            stmt = stmt.where(DailyBalanceModel.user_id.in_(list(user_ids)))
+        self.db.execute(stmt)
+
+    def add_from_select(self, source) -> None:
+        # source: (user_id, date, type, category_id, soma, contagem) já agregado.
+        self.db.execute(_insert_from(source))
+
+    def detach_category_ctes(self, user_id, category_id) -> list:
+        # Espelha o ON DELETE SET NULL de transactions.category_id: as linhas da
+        # categoria saem do rollup e são somadas ao balde sem categoria.
+        moved = (
+            delete(DailyBalanceModel)
+            .where(DailyBalanceModel.user_id == user_id, DailyBalanceModel.category_id == category_id)
+            .returning(*DailyBalanceModel.__table__.c)
+            .cte("detached_balances")
+        )
+        source = select(
+            moved.c.user_id,
+            moved.c.date,
+            moved.c.type,
+            literal(None, type_=DailyBalanceModel.category_id.type),
+            moved.c.amount_total,
+            moved.c.transaction_count,
+        )
+        return [moved, self.upsert_cte(source, "reattached_balances")]
+
+    def rebuild(self, user_id=None) -> None:
+        for attempt in range(REBUILD_ATTEMPTS):
+            try:
+                self._lock(user_id)
+                self._regenerate(user_id)
+                return
+            except DBAPIError as exc:
+                # Uma escrita do usuário que já tocou no rollup e ainda não travou a linha
+                # em users pode formar um deadlock com a reconstrução: tenta de novo.
+                self.db.rollback()
+                if getattr(exc.orig, "sqlstate", None) != "40P01" or attempt == REBUILD_ATTEMPTS - 1:
+                    raise
+
+    def backfill(self) -> bool:
+        # Base criada por create_all (AUTO_CREATE_DB) sobre lançamentos existentes: o
+        # rollup nasce vazio e o dashboard mostraria zero. Gera o rollup uma única vez.
+        needed = select(exists(select(TransactionModel.id)) & ~exists(select(DailyBalanceModel.user_id)))
+        if not self.db.execute(needed).scalar_one():
+            return False
+        # Confere de novo já com o lock: outro worker pode ter gerado o rollup antes.
+        self._lock(None)
+        if not self.db.execute(needed).scalar_one():
+            self.db.commit()
+            return False
+        self._regenerate(None)
+        return True
+
+    def _lock(self, user_id) -> None:
+        if user_id:
+            # Só as escritas deste usuário esperam: todas incrementam users.data_version na
+            # própria transação, e a linha do usuário fica travada até o commit.
+            self.db.execute(select(func.pg_advisory_xact_lock_shared(REBUILD_LOCK_KEY)))
+            self.db.execute(select(UserModel.id).where(UserModel.id == user_id).with_for_update(key_share=True))
+            return
+        # Reconstrução completa: bloqueia escritas em transactions de todos os usuários.
+        self.db.execute(select(func.pg_advisory_xact_lock(REBUILD_LOCK_KEY)))
+        self.db.execute(text("LOCK TABLE transactions IN SHARE MODE"))
+
+    def _regenerate(self, user_id) -> None:
+        # Apaga e regenera a partir de transactions; dias sem lançamentos não voltam.
+        stmt = delete(DailyBalanceModel)
+        if user_id:
+            stmt = stmt.where(DailyBalanceModel.user_id == user_id)
+        self.db.execute(stmt)
+
+        source = select(
+            TransactionModel.user_id,
+            TransactionModel.date,
+            TransactionModel.type,
+            TransactionModel.category_id,
+            func.sum(TransactionModel.amount),
+            func.count(),
+        ).group_by(
+            TransactionModel.user_id,
+            TransactionModel.date,
+            TransactionModel.type,
+            TransactionModel.category_id,
+        )
+        if user_id:
+            source = source.where(TransactionModel.user_id == user_id)
+        self.db.execute(
+            insert(DailyBalanceModel).from_select(
+                ["user_id", "date", "type", "category_id", "amount_total", "transaction_count"],
+                source,
+            )
+        )
+        # Os totais podem ter mudado: novas ETags e cache do resumo invalidado.
+        users = UserModel.__table__
+        bump = update(users).values(data_version=users.c.data_version + 1).returning(users.c.id)
+        if user_id:
+            bump = bump.where(users.c.id == user_id)
+        user_ids = self.db.execute(bump).scalars().all()
+        self.db.commit()
+        for affected in user_ids:
+            query_cache.invalidate(affected, DASHBOARD_SUMMARY_CACHE)
+
+    def summary(self, user_id, start_date=None, end_date=None) -> tuple[Decimal, Decimal, int]:
+        stmt = select(
+            func.coalesce(
+                func.sum(DailyBalanceModel.amount_total).filter(DailyBalanceModel.type == TransactionType.INCOME), 0
+            ),
+            func.coalesce(
+                func.sum(DailyBalanceModel.amount_total).filter(DailyBalanceModel.type == TransactionType.EXPENSE), 0
+            ),
+            func.coalesce(func.sum(DailyBalanceModel.transaction_count), 0),
+        ).where(DailyBalanceModel.user_id == user_id)
+        if start_date:
+            stmt = stmt.where(DailyBalanceModel.date >= start_date)
+        if end_date:
+            stmt = stmt.where(DailyBalanceModel.date <= end_date)
+        return tuple(self.db.execute(stmt).one())
+
+    def timeseries(self, user_id, granularity: str, start_date=None, end_date=None) -> list[dict]:
+        period = func.date_trunc(granularity, DailyBalanceModel.date).cast(Date)
+        signed_amount = case(
+            (DailyBalanceModel.type == TransactionType.INCOME, DailyBalanceModel.amount_total),
+            else_=-DailyBalanceModel.amount_total,
+        )
+
+        # O saldo acumulado parte do saldo anterior ao período filtrado.
+        opening = literal(0)
+        if start_date:
+            opening = (
+                select(func.coalesce(func.sum(signed_amount), 0))
+                .where(DailyBalanceModel.user_id == user_id, DailyBalanceModel.date < start_date)
+                .scalar_subquery()
+            )
+
+        stmt = select(
+            period.label("period"),
+            func.coalesce(
+                func.sum(DailyBalanceModel.amount_total).filter(DailyBalanceModel.type == TransactionType.INCOME), 0
+            ).label("total_income"),
+            func.coalesce(
+                func.sum(DailyBalanceModel.amount_total).filter(DailyBalanceModel.type == TransactionType.EXPENSE), 0
+            ).label("total_expense"),
+            (opening + func.sum(func.sum(signed_amount)).over(order_by=period)).label("balance"),
+        ).where(DailyBalanceModel.user_id == user_id)
+        if start_date:
+            stmt = stmt.where(DailyBalanceModel.date >= start_date)
+        if end_date:
+            stmt = stmt.where(DailyBalanceModel.date <= end_date)
+        # Dias zerados por exclusões e edições podem continuar no rollup até a limpeza.
+        stmt = stmt.group_by(period).having(func.sum(DailyBalanceModel.transaction_count) > 0).order_by(period)
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    def by_category(self, user_id, start_date=None, end_date=None) -> list[dict]:
+        income = func.coalesce(
+            func.sum(DailyBalanceModel.amount_total).filter(DailyBalanceModel.type == TransactionType.INCOME), 0
+        )
+        expense = func.coalesce(
+            func.sum(DailyBalanceModel.amount_total).filter(DailyBalanceModel.type == TransactionType.EXPENSE), 0
+        )
+        stmt = (
+            select(
+                DailyBalanceModel.category_id,
+                CategoryModel.name,
+                income.label("total_income"),
+                expense.label("total_expense"),
+                func.sum(DailyBalanceModel.transaction_count).label("transaction_count"),
+            )
+            .outerjoin(CategoryModel, CategoryModel.id == DailyBalanceModel.category_id)
+            .where(DailyBalanceModel.user_id == user_id)
+        )
+        if start_date:
+            stmt = stmt.where(DailyBalanceModel.date >= start_date)
+        if end_date:
+            stmt = stmt.where(DailyBalanceModel.date <= end_date)
+        stmt = (
+            stmt.group_by(DailyBalanceModel.category_id, CategoryModel.name)
+            .having(func.sum(DailyBalanceModel.transaction_count) > 0)
+            .order_by((income + expense).desc(), CategoryModel.name.asc())
+        )
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
@@ -1,10 +1,42 @@
-﻿from app.domain.entities.user import User
+﻿from app.core.instrumentation import timed
+from app.domain.entities.user import User
 from app.domain.entities.category import Category
 from app.domain.entities.transaction import Transaction
 from app.infrastructure.db.models.user_model import UserModel
 from app.infrastructure.db.models.category_model import CategoryModel
 from app.infrastructure.db.models.transaction_model import TransactionModel
 
+# Colunas das entidades: leituras que só precisam da entidade selecionam estas colunas
+# como linhas Core e constroem a dataclass direto, sem instanciar o modelo ORM nem
+# passar pelo identity map. A construção é por nome (row._mapping), então a ordem
+# aqui não precisa acompanhar a dos campos.
+USER_COLUMNS = (
+    UserModel.id,
+    UserModel.email,
+    UserModel.hashed_password,
+    UserModel.is_active,
+    UserModel.created_at,
+)
+CATEGORY_COLUMNS = (
+    CategoryModel.id,
+    CategoryModel.user_id,
+    CategoryModel.name,
+    CategoryModel.type,
+    CategoryModel.created_at,
+    CategoryModel.updated_at,
+)
+TRANSACTION_COLUMNS = (
+    TransactionModel.id,
+    TransactionModel.user_id,
+    TransactionModel.category_id,
+    TransactionModel.type,
+    TransactionModel.amount,
+    TransactionModel.description,
+    TransactionModel.date,
+    TransactionModel.created_at,
+    TransactionModel.updated_at,
+)
+
 
 def user_model_to_entity(model: UserModel) -> User:
     return User(
@@ -39,3 +71,22 @@ def transaction_model_to_entity(model: TransactionModel) -> Transaction:
         created_at=model.created_at,
         updated_at=model.updated_at,
     )
+
+
+def map_rows(rows, mapper) -> list:
+    # Iterar o resultado (processamento das linhas pelo SQLAlchemy) e construir as
+    # entidades entra no tempo de mapeamento da requisição.
+    with timed("mapping_seconds"):
+        return [mapper(row) for row in rows]
+
+
+def user_row_to_entity(row) -> User:
+    return User(**row._mapping)
+
+
+def category_row_to_entity(row) -> Category:
+    return Category(**row._mapping)
+
+
+def transaction_row_to_entity(row) -> Transaction:
+    return Transaction(**row._mapping)
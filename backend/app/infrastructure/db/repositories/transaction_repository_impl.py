@@ -1,19 +1,85 @@
-﻿from datetime import date
+﻿import uuid
+from datetime import date
 from decimal import Decimal
-from sqlalchemy import func, select
+from sqlalchemy import (
+    Column,
+    Date,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    Text,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ENUM, UUID
 from sqlalchemy.orm import Session
 from app.domain.entities.transaction import TransactionType
-from app.domain.repositories.transaction_repository import TransactionRepository
+from app.domain.repositories.query_cache import DASHBOARD_SUMMARY_CACHE
+from app.domain.repositories.transaction_repository import TransactionCursor, TransactionRepository
+from app.infrastructure.cache.query_cache import query_cache
+from app.infrastructure.db.models.category_model import CategoryModel
 from app.infrastructure.db.models.transaction_model import TransactionModel
-from app.infrastructure.db.repositories.mappers import transaction_model_to_entity
+from app.infrastructure.db.repositories.daily_balance_repository_impl import DailyBalanceRepositoryImpl
+from app.infrastructure.db.repositories.mappers import (
+    TRANSACTION_COLUMNS,
+    map_rows,
+    transaction_model_to_entity,
+    transaction_row_to_entity,
+)
+from app.infrastructure.db.repositories.user_repository_impl import bump_data_version
+
+# Tabela temporária da importação em lote; fora do Base para não entrar no create_all.
+import_staging = Table(
+    "transactions_import",
+    MetaData(),
+    Column("category_id", UUID(as_uuid=True)),
+    Column("type", ENUM(TransactionType, name="transaction_type", create_type=False)),
+    Column("amount", Numeric(14, 2)),
+    Column("description", String(255)),
+    Column("date", Date),
+    Column("line", Integer),
+    prefixes=["TEMPORARY"],
+)
+IMPORT_COLUMNS = ["category_id", "type", "amount", "description", "date"]
+
+
+def _owns_category(user_id, category_id):
+    return (
+        select(CategoryModel.id)
+        .where(CategoryModel.id == category_id, CategoryModel.user_id == user_id)
+        .exists()
+    )
+
+
+def _delta(transaction, sign: int) -> tuple:
+    return (
+        transaction.user_id,
+        transaction.date,
+        transaction.type,
+        transaction.category_id,
+        sign * transaction.amount,
+        sign,
+    )
 
 
 class TransactionRepositoryImpl(TransactionRepository):
     def __init__(self, db: Session):
         self.db = db
+        self.balances = DailyBalanceRepositoryImpl(db)
 
-    def list_by_user(self, user_id, start_date=None, end_date=None, type=None, category_id=None):
-        stmt = select(TransactionModel).where(TransactionModel.user_id == user_id)
+    def _filtered(self, stmt, user_id, start_date=None, end_date=None, type=None, category_id=None):
+        stmt = stmt.where(TransactionModel.user_id == user_id)
         if start_date:
             stmt = stmt.where(TransactionModel.date >= start_date)
         if end_date:
@@ -22,81 +88,429 @@ class TransactionRepositoryImpl(TransactionRepository):
             stmt = stmt.where(TransactionModel.type == type)
         if category_id:
             stmt = stmt.where(TransactionModel.category_id == category_id)
+        return stmt
+
+    def _keyset(self, stmt, user_id, after=None, start_date=None, end_date=None, type=None, category_id=None):
+        stmt = self._filtered(stmt, user_id, start_date, end_date, type, category_id)
+        if after:
+            # Keyset: continua a partir da última linha vista, sem OFFSET.
+            stmt = stmt.where(
+                tuple_(TransactionModel.date, TransactionModel.created_at, TransactionModel.id)
+                < tuple_(after.date, after.created_at, after.id)
+            )
+        return stmt.order_by(
+            TransactionModel.date.desc(),
+            TransactionModel.created_at.desc(),
+            TransactionModel.id.desc(),
+        )
+
+    def list_by_user(self, user_id, start_date=None, end_date=None, type=None, category_id=None):
+        stmt = self._filtered(select(*TRANSACTION_COLUMNS), user_id, start_date, end_date, type, category_id)
         stmt = stmt.order_by(TransactionModel.date.desc(), TransactionModel.created_at.desc())
-        models = self.db.execute(stmt).scalars().all()
-        return [transaction_model_to_entity(model) for model in models]
+        return map_rows(self.db.execute(stmt), transaction_row_to_entity)
+
+    def list_page_by_user(
+        self,
+        user_id,
+        limit: int,
+        after: TransactionCursor | None = None,
+        start_date=None,
+        end_date=None,
+        type=None,
+        category_id=None,
+    ):
+        stmt = self._keyset(select(*TRANSACTION_COLUMNS), user_id, after, start_date, end_date, type, category_id)
+        return map_rows(self.db.execute(stmt.limit(limit)), transaction_row_to_entity)
+
+    def stream_statement(self, user_id, after=None, start_date=None, end_date=None, type=None, category_id=None):
+        return self._keyset(select(*TRANSACTION_COLUMNS), user_id, after, start_date, end_date, type, category_id)
+
+    def iter_by_user(
+        self,
+        user_id,
+        after: TransactionCursor | None = None,
+        start_date=None,
+        end_date=None,
+        type=None,
+        category_id=None,
+        batch_size: int = 2000,
+    ):
+        # Mesma ordem da listagem paginada, lida por um cursor no servidor (yield_per).
+        stmt = self.stream_statement(user_id, after, start_date, end_date, type, category_id)
+        result = self.db.execute(stmt, execution_options={"yield_per": batch_size})
+        for partition in result.partitions():
+            yield map_rows(partition, transaction_row_to_entity)
+
+    def iter_export_rows(
+        self,
+        user_id,
+        start_date=None,
+        end_date=None,
+        type=None,
+        category_id=None,
+        batch_size: int = 2000,
+    ):
+        # Cursor no servidor (yield_per) só com as colunas do CSV: memória constante
+        # e o primeiro lote sai sem esperar a consulta inteira.
+        stmt = select(
+            TransactionModel.id,
+            TransactionModel.category_id,
+            TransactionModel.type,
+            TransactionModel.amount,
+            TransactionModel.description,
+            TransactionModel.date,
+        )
+        stmt = self._filtered(stmt, user_id, start_date, end_date, type, category_id)
+        stmt = stmt.order_by(TransactionModel.date.desc(), TransactionModel.created_at.desc())
+        result = self.db.execute(stmt, execution_options={"yield_per": batch_size})
+        for partition in result.partitions():
+            yield partition
+
+    def copy_export_csv(
+        self,
+        user_id,
+        start_date=None,
+        end_date=None,
+        type=None,
+        category_id=None,
+        chunk_size: int = 64 * 1024,
+    ):
+        # COPY ... TO STDOUT: o Postgres gera o CSV (formatação de valores e datas
+        # inclusa) e os blocos são repassados sem passar por objetos Python por linha.
+        stmt = select(
+            TransactionModel.id.label("id"),
+            TransactionModel.category_id.label("categoria_id"),
+            func.lower(cast(TransactionModel.type, Text)).label("tipo"),
+            cast(TransactionModel.amount, Text).label("valor"),
+            # Texto vazio vira NULL: o COPY poria "" e o motor python, campo vazio.
+            func.nullif(TransactionModel.description, "").label("descricao"),
+            func.to_char(TransactionModel.date, "YYYY-MM-DD").label("data"),
+        )
+        stmt = self._filtered(stmt, user_id, start_date, end_date, type, category_id)
+        stmt = stmt.order_by(TransactionModel.date.desc(), TransactionModel.created_at.desc())
+        # Os filtros já chegam tipados (UUID, date, enum), então podem ir como literais.
+        query = stmt.compile(dialect=self.db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+
+        cursor = self.db.connection().connection.driver_connection.cursor()
+        try:
+            with cursor.copy(f"COPY ({query}) TO STDOUT WITH CSV HEADER") as copy:
+                buffer = bytearray()
+                for data in copy:
+                    buffer += data
+                    if len(buffer) >= chunk_size:
+                        yield bytes(buffer)
+                        buffer.clear()
+                if buffer:
+                    yield bytes(buffer)
+        finally:
+            cursor.close()
+
+    def stage_import(self, batches):
+        # COPY FROM STDIN na tabela temporária; nada é gravado em transactions até commit_import.
+        connection = self.db.connection()
+        import_staging.drop(connection, checkfirst=True)
+        import_staging.create(connection)
+        # Mesmo valor que o ORM grava para o enum.
+        type_to_db = import_staging.c.type.type.bind_processor(connection.dialect)
+        staged = 0
+        columns = ", ".join([*IMPORT_COLUMNS, "line"])
+        with connection.connection.driver_connection.cursor() as cursor:
+            with cursor.copy(f"COPY {import_staging.name} ({columns}) FROM STDIN") as copy:
+                for batch in batches:
+                    for line, category_id, type, amount, description, date_ in batch:
+                        copy.write_row((category_id, type_to_db(type), amount, description, date_, line))
+                    staged += len(batch)
+        return staged
+
+    def invalid_import_lines(self, user_id, limit: int):
+        # Conferência definitiva das categorias das linhas copiadas: as do usuário ficam
+        # travadas (FOR KEY SHARE) até o commit; devolve (total, primeiras linhas) das demais.
+        staged = import_staging.c
+        self.db.execute(
+            select(CategoryModel.id)
+            .where(
+                CategoryModel.user_id == user_id,
+                CategoryModel.id.in_(select(staged.category_id).where(staged.category_id.is_not(None))),
+            )
+            .with_for_update(read=True, key_share=True)
+        ).all()
+        rows = self.db.execute(
+            select(staged.line, func.count().over())
+            .where(staged.category_id.is_not(None), ~_owns_category(user_id, staged.category_id))
+            .order_by(staged.line)
+            .limit(limit)
+        ).all()
+        return (rows[0][1] if rows else 0), [line for line, _ in rows]
+
+    def commit_import(self, user_id):
+        staged = import_staging.c
+        self.db.execute(
+            insert(TransactionModel.__table__).from_select(
+                ["id", "user_id", *IMPORT_COLUMNS],
+                select(
+                    func.gen_random_uuid(),
+                    literal(user_id, UUID(as_uuid=True)),
+                    staged.category_id,
+                    staged.type,
+                    staged.amount,
+                    staged.description,
+                    staged.date,
+                ),
+            )
+        )
+        self.balances.add_from_select(
+            select(
+                literal(user_id, UUID(as_uuid=True)),
+                staged.date,
+                staged.type,
+                staged.category_id,
+                func.sum(staged.amount),
+                func.count(),
+            ).group_by(staged.date, staged.type, staged.category_id)
+        )
+        imported = self.db.execute(select(func.count()).select_from(import_staging)).scalar_one()
+        import_staging.drop(self.db.connection())
+        if imported:
+            self.db.execute(bump_data_version(user_id))
+        self.db.commit()
+        if imported:
+            query_cache.invalidate(user_id, DASHBOARD_SUMMARY_CACHE)
+        return imported
+
+    def abort_import(self):
+        # Só a tabela temporária foi tocada; basta descartá-la.
+        import_staging.drop(self.db.connection(), checkfirst=True)
+
+    def existing_ids(self, user_id, transaction_ids):
+        # FOR UPDATE: as linhas ficam travadas até o commit do lote que as valida.
+        stmt = (
+            select(TransactionModel.id)
+            .where(TransactionModel.user_id == user_id, TransactionModel.id.in_(list(transaction_ids)))
+            .with_for_update()
+        )
+        return set(self.db.execute(stmt).scalars())
+
+    def apply_batch(self, user_id, creates, updates, delete_ids):
+        # Um INSERT, um UPDATE e um DELETE (todos com RETURNING) e um upsert no rollup,
+        # na mesma transação.
+        table = TransactionModel.__table__
+        deltas = []
+
+        created = []
+        if creates:
+            rows = [{"id": uuid.uuid4(), "user_id": user_id, **item} for item in creates]
+            by_id = {row.id: row for row in self.db.execute(insert(table).values(rows).returning(*table.c))}
+            created = [transaction_model_to_entity(by_id[row["id"]]) for row in rows]
+            deltas += [_delta(t, 1) for t in created]
+
+        updated = []
+        if updates:
+            source = values(
+                column("id", UUID(as_uuid=True)),
+                column("category_id", UUID(as_uuid=True)),
+                column("type", table.c.type.type),
+                column("amount", table.c.amount.type),
+                column("description", table.c.description.type),
+                column("date", table.c.date.type),
+                name="batch",
+            ).data(
+                [
+                    (item["id"], item["category_id"], item["type"], item["amount"], item["description"], item["date"])
+                    for item in updates
+                ]
+            )
+            # Auto-junção com "old": o RETURNING devolve também os valores anteriores ao UPDATE.
+            old = table.alias("old")
+            stmt = (
+                update(table)
+                .where(table.c.id == source.c.id, table.c.user_id == user_id, old.c.id == table.c.id)
+                .values(
+                    category_id=cast(source.c.category_id, table.c.category_id.type),
+                    type=cast(source.c.type, table.c.type.type),
+                    amount=source.c.amount,
+                    description=source.c.description,
+                    date=source.c.date,
+                )
+                .returning(
+                    *table.c,
+                    old.c.category_id.label("old_category_id"),
+                    old.c.type.label("old_type"),
+                    old.c.amount.label("old_amount"),
+                    old.c.date.label("old_date"),
+                )
+            )
+            by_id = {}
+            for row in self.db.execute(stmt):
+                by_id[row.id] = transaction_model_to_entity(row)
+                deltas.append((user_id, row.old_date, row.old_type, row.old_category_id, -row.old_amount, -1))
+                deltas.append(_delta(by_id[row.id], 1))
+            updated = [by_id[item["id"]] for item in updates if item["id"] in by_id]
+
+        deleted = []
+        if delete_ids:
+            stmt = delete(table).where(table.c.user_id == user_id, table.c.id.in_(delete_ids)).returning(*table.c)
+            deleted = [transaction_model_to_entity(row) for row in self.db.execute(stmt)]
+            deltas += [_delta(t, -1) for t in deleted]
+
+        self.balances.apply_many(deltas)
+        if deltas:
+            self.db.execute(bump_data_version(user_id))
+        self.db.commit()
+        if deltas:
+            query_cache.invalidate(user_id, DASHBOARD_SUMMARY_CACHE)
+        return created, updated, deleted
 
     def get_by_id(self, transaction_id, user_id):
-        stmt = select(TransactionModel).where(
+        stmt = select(*TRANSACTION_COLUMNS).where(
             TransactionModel.id == transaction_id,
             TransactionModel.user_id == user_id,
         )
-        model = self.db.execute(stmt).scalars().first()
-        return transaction_model_to_entity(model) if model else None
+        row = self.db.execute(stmt).first()
+        return transaction_row_to_entity(row) if row else None
 
     def create(self, user_id, category_id, type: TransactionType, amount: Decimal, description, date: date):
-        model = TransactionModel(
-            user_id=user_id,
-            category_id=category_id,
-            type=type,
-            amount=amount,
-            description=description,
-            date=date,
+        # Um único comando: INSERT ... SELECT (só insere se a categoria for do usuário),
+        # RETURNING da linha criada e o upsert do rollup numa CTE.
+        table = TransactionModel.__table__
+        row = select(
+            *(
+                cast(literal(value, column.type), column.type)
+                for column, value in (
+                    (table.c.id, uuid.uuid4()),
+                    (table.c.user_id, user_id),
+                    (table.c.category_id, category_id),
+                    (table.c.type, type),
+                    (table.c.amount, amount),
+                    (table.c.description, description),
+                    (table.c.date, date),
+                )
+            )
         )
-        self.db.add(model)
+        if category_id:
+            row = row.where(_owns_category(user_id, category_id))
+        inserted = (
+            insert(table)
+            .from_select(["id", "user_id", *IMPORT_COLUMNS], row)
+            .returning(*table.c)
+            .cte("inserted")
+        )
+        rollup = self.balances.upsert_cte(
+            select(
+                inserted.c.user_id,
+                inserted.c.date,
+                inserted.c.type,
+                inserted.c.category_id,
+                inserted.c.amount,
+                literal(1),
+            )
+        )
+        result = self.db.execute(select(inserted).add_cte(rollup, bump_data_version(user_id, inserted))).first()
         self.db.commit()
-        self.db.refresh(model)
-        return transaction_model_to_entity(model)
+        if result:
+            query_cache.invalidate(user_id, DASHBOARD_SUMMARY_CACHE)
+        return transaction_model_to_entity(result) if result else None
 
     def update(self, transaction_id, user_id, category_id, type: TransactionType, amount: Decimal, description, date: date):
-        stmt = select(TransactionModel).where(
-            TransactionModel.id == transaction_id,
-            TransactionModel.user_id == user_id,
+        table = TransactionModel.__table__
+        # FOR UPDATE na CTE garante que "old" é a versão que o UPDATE vai substituir.
+        old = (
+            select(table)
+            .where(table.c.id == transaction_id, table.c.user_id == user_id)
+            .with_for_update()
+            .cte("old")
+        )
+        stmt = update(table).where(table.c.id == old.c.id)
+        if category_id:
+            stmt = stmt.where(_owns_category(user_id, category_id))
+        updated = (
+            stmt.values(
+                category_id=category_id,
+                type=type,
+                amount=amount,
+                description=description,
+                date=date,
+            )
+            .returning(*table.c)
+            .cte("updated")
+        )
+        deltas = union_all(
+            select(
+                old.c.user_id,
+                old.c.date,
+                old.c.type,
+                old.c.category_id,
+                (-old.c.amount).label("amount"),
+                literal(-1).label("count"),
+            ).where(old.c.id == updated.c.id),
+            select(
+                updated.c.user_id,
+                updated.c.date,
+                updated.c.type,
+                updated.c.category_id,
+                updated.c.amount,
+                literal(1),
+            ),
+        ).subquery()
+        key = [deltas.c.user_id, deltas.c.date, deltas.c.type, deltas.c.category_id]
+        rollup = self.balances.upsert_cte(
+            select(*key, func.sum(deltas.c.amount), func.sum(deltas.c.count)).group_by(*key)
         )
-        model = self.db.execute(stmt).scalars().first()
-        if not model:
-            return None
-        model.category_id = category_id
-        model.type = type
-        model.amount = amount
-        model.description = description
-        model.date = date
+        emptied = self.balances.emptied_dates(rollup).label("emptied_dates")
+        result = self.db.execute(
+            select(updated, emptied).add_cte(rollup, bump_data_version(user_id, updated))
+        ).first()
+        if result:
+            self.balances.prune_days(user_id, result.emptied_dates)
         self.db.commit()
-        self.db.refresh(model)
-        return transaction_model_to_entity(model)
+        if result:
+            query_cache.invalidate(user_id, DASHBOARD_SUMMARY_CACHE)
+        return transaction_model_to_entity(result) if result else None
 
     def delete(self, transaction_id, user_id) -> bool:
-        stmt = select(TransactionModel).where(
-            TransactionModel.id == transaction_id,
-            TransactionModel.user_id == user_id,
+        table = TransactionModel.__table__
+        deleted = (
+            delete(table)
+            .where(table.c.id == transaction_id, table.c.user_id == user_id)
+            .returning(*table.c)
+            .cte("deleted")
+        )
+        rollup = self.balances.upsert_cte(
+            select(
+                deleted.c.user_id,
+                deleted.c.date,
+                deleted.c.type,
+                deleted.c.category_id,
+                -deleted.c.amount,
+                literal(-1),
+            )
         )
-        model = self.db.execute(stmt).scalars().first()
-        if not model:
-            return False
-        self.db.delete(model)
+        version = bump_data_version(user_id, deleted)
+        emptied = self.balances.emptied_dates(rollup)
+        count, emptied_dates = self.db.execute(
+            select(func.count(), emptied).select_from(deleted).add_cte(rollup, version)
+        ).one()
+        self.balances.prune_days(user_id, emptied_dates)
         self.db.commit()
-        return True
+        if count:
+            query_cache.invalidate(user_id, DASHBOARD_SUMMARY_CACHE)
+        return count > 0
 
     def summary(self, user_id, start_date=None, end_date=None) -> dict:
-        def _sum_by_type(tx_type: TransactionType):
-            stmt = select(func.coalesce(func.sum(TransactionModel.amount), 0)).where(
-                TransactionModel.user_id == user_id,
-                TransactionModel.type == tx_type,
-            )
-            if start_date:
-                stmt = stmt.where(TransactionModel.date >= start_date)
-            if end_date:
-                stmt = stmt.where(TransactionModel.date <= end_date)
-            return self.db.execute(stmt).scalar_one()
-
-        total_income = _sum_by_type(TransactionType.INCOME)
-        total_expense = _sum_by_type(TransactionType.EXPENSE)
+        # Lido do rollup diário: custo proporcional aos dias do período, não às transações.
+        total_income, total_expense, transaction_count = self.balances.summary(user_id, start_date, end_date)
         balance = Decimal(total_income) - Decimal(total_expense)
 
         return {
             "total_income": total_income,
             "total_expense": total_expense,
             "balance": balance,
+            "transaction_count": transaction_count,
             "start_date": start_date,
             "end_date": end_date,
         }
+
+    def category_breakdown(self, user_id, start_date=None, end_date=None) -> list[dict]:
+        return self.balances.by_category(user_id, start_date, end_date)
+
+    def timeseries(self, user_id, granularity: str, start_date=None, end_date=None) -> list[dict]:
+        return self.balances.timeseries(user_id, granularity, start_date, end_date)
@@ -1,8 +1,20 @@
-﻿from sqlalchemy import select
+﻿from sqlalchemy import exists, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from app.domain.repositories.user_repository import UserRepository
+from app.infrastructure.cache.user_cache import user_cache
 from app.infrastructure.db.models.user_model import UserModel
-from app.infrastructure.db.repositories.mappers import user_model_to_entity
+from app.infrastructure.db.repositories.mappers import USER_COLUMNS, user_model_to_entity, user_row_to_entity
+
+
+def bump_data_version(user_id, written=None):
+    # Incrementa users.data_version. Com "written" (CTE da escrita) vira uma CTE do
+    # mesmo comando e só incrementa se a escrita afetou alguma linha.
+    table = UserModel.__table__
+    stmt = update(table).where(table.c.id == user_id).values(data_version=table.c.data_version + 1)
+    if written is None:
+        return stmt
+    return stmt.where(exists(select(1).select_from(written))).returning(table.c.data_version).cte("data_version")
 
 
 class UserRepositoryImpl(UserRepository):
@@ -10,18 +22,42 @@ class UserRepositoryImpl(UserRepository):
         self.db = db
 
     def get_by_email(self, email: str):
-        stmt = select(UserModel).where(UserModel.email == email)
-        model = self.db.execute(stmt).scalars().first()
-        return user_model_to_entity(model) if model else None
+        stmt = select(*USER_COLUMNS).where(UserModel.email == email)
+        row = self.db.execute(stmt).first()
+        return user_row_to_entity(row) if row else None
 
     def get_by_id(self, user_id):
-        stmt = select(UserModel).where(UserModel.id == user_id)
-        model = self.db.execute(stmt).scalars().first()
-        return user_model_to_entity(model) if model else None
+        stmt = select(*USER_COLUMNS).where(UserModel.id == user_id)
+        row = self.db.execute(stmt).first()
+        return user_row_to_entity(row) if row else None
+
+    def get_data_version(self, user_id):
+        stmt = select(UserModel.data_version).where(UserModel.id == user_id)
+        return self.db.execute(stmt).scalar_one_or_none()
 
     def create(self, email: str, hashed_password: str):
-        model = UserModel(email=email, hashed_password=hashed_password)
-        self.db.add(model)
+        # ON CONFLICT DO NOTHING: e-mail já cadastrado devolve None sem SELECT prévio.
+        table = UserModel.__table__
+        stmt = (
+            insert(table)
+            .values(email=email, hashed_password=hashed_password)
+            .on_conflict_do_nothing(index_elements=[table.c.email])
+            .returning(*table.c)
+        )
+        row = self.db.execute(stmt).first()
         self.db.commit()
-        self.db.refresh(model)
-        return user_model_to_entity(model)
+        return user_model_to_entity(row) if row else None
+
+    def _update(self, user_id, **values):
+        table = UserModel.__table__
+        stmt = update(table).where(table.c.id == user_id).values(**values).returning(*table.c)
+        row = self.db.execute(stmt).first()
+        self.db.commit()
+        user_cache.delete(user_id)
+        return user_model_to_entity(row) if row else None
+
+    def update_password(self, user_id, hashed_password: str):
+        return self._update(user_id, hashed_password=hashed_password)
+
+    def set_active(self, user_id, is_active: bool):
+        return self._update(user_id, is_active=is_active)
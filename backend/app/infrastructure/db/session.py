@@ -1,13 +1,13 @@
 ﻿from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import get_settings
+from app.infrastructure.db.instrumentation import instrument_engine
+from app.infrastructure.db.pool import engine_options
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-)
+engine = create_engine(settings.database_url, **engine_options())
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
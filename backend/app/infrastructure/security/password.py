@@ -1,11 +1,97 @@
-﻿from passlib.context import CryptContext
+﻿import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from app.core.config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+settings = get_settings()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class BoundedExecutor:
+    # Pool dedicado ao bcrypt: no máximo `workers` hashes em paralelo e `queue_size`
+    # aguardando. Acima disso a chamada falha na hora em vez de ocupar mais threads.
+    def __init__(self, workers: int, queue_size: int, name: str = "password-hash"):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+
+    def _admit(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusyError("Fila de hash de senha cheia")
+        with self._lock:
+            self.queued += 1
+
+    def run(self, fn, *args):
+        self._admit()
+        try:
+            return self._executor.submit(self._call, fn, *args).result()
+        finally:
+            self._slots.release()
+
+    async def run_async(self, fn, *args):
+        # Aguarda o hash sem ocupar uma thread do pool usado pelas rotas síncronas.
+        self._admit()
+        future = self._executor.submit(self._call, fn, *args)
+        # O slot só é liberado quando o hash termina, mesmo que a requisição seja cancelada.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+        self._slots.release()
+
+    def _call(self, fn, *args):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "active": self.active,
+                "queued": self.queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_executor = BoundedExecutor(settings.password_hash_workers, settings.password_hash_queue_size)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_executor.run(pwd_context.verify, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_executor.run(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run_async(pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_executor.run_async(pwd_context.hash, password)
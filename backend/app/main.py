@@ -7,14 +7,23 @@ from fastapi.exception_handlers import http_exception_handler
 from fastapi.responses import JSONResponse
 from app.core.config import get_settings
 from app.infrastructure.db.base import Base
-from app.infrastructure.db.session import engine
+from app.infrastructure.db.repositories.daily_balance_repository_impl import DailyBalanceRepositoryImpl
+from app.infrastructure.db.session import SessionLocal, engine
 from app.infrastructure.db import models  # noqa: F401
+from app.infrastructure.security.password import PasswordHasherBusyError
+from app.presentation.api import monitoring
 from app.presentation.api.v1.router import api_router
+from app.presentation.compression import CompressionMiddleware
+from app.presentation.instrumentation import InstrumentationMiddleware
+from app.presentation.responses import FastJSONResponse, InstrumentedJSONResponse
 
 settings = get_settings()
 logger = logging.getLogger("app.startup")
 
-app = FastAPI(title=settings.project_name)
+app = FastAPI(
+    title=settings.project_name,
+    default_response_class=FastJSONResponse if settings.fast_json else InstrumentedJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +31,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+
+if settings.enable_compression:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_level,
+        brotli_quality=settings.brotli_quality,
+    )
+
+# Por último: envolve os demais middlewares e mede a requisição inteira.
+app.add_middleware(
+    InstrumentationMiddleware,
+    slow_request_ms=settings.slow_request_ms,
+    server_timing=settings.server_timing,
 )
 
 
@@ -61,6 +86,15 @@ async def custom_http_exception_handler(request: Request, exc: HTTPException):
     return await http_exception_handler(request, exc)
 
 
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Muitas autenticações simultâneas. Tente novamente em instantes."},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.on_event("startup")
 def on_startup():
     logger.info("Starting %s (%s)", settings.project_name, settings.environment)
@@ -75,6 +109,11 @@ def on_startup():
     if settings.auto_create_db:
         Base.metadata.create_all(bind=engine)
         logger.info("Database schema ensured (auto_create_db=true)")
+        # create_all cria daily_balances vazia mesmo com lançamentos já gravados.
+        with SessionLocal() as db:
+            if DailyBalanceRepositoryImpl(db).backfill():
+                logger.info("daily_balances rollup built from existing transactions")
 
 
+app.include_router(monitoring.router)
 app.include_router(api_router, prefix=settings.api_v1_str)
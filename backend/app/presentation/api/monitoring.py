@@ -0,0 +1,101 @@
+﻿from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import get_settings
+from app.core.metrics import register_collector, render_prometheus
+from app.domain.repositories.query_cache import CATEGORIES_CACHE, DASHBOARD_SUMMARY_CACHE
+from app.infrastructure.cache.query_cache import query_cache
+from app.infrastructure.cache.user_cache import user_cache
+from app.infrastructure.db.async_session import async_engine
+from app.infrastructure.db.session import engine
+from app.infrastructure.security.password import password_executor
+
+router = APIRouter(tags=["monitoring"])
+settings = get_settings()
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_metrics():
+    engines = [("sync", engine)]
+    if settings.db_async:
+        engines.append(("async", async_engine.sync_engine))
+    size, checked_out, overflow = [], [], []
+    for label, bound in engines:
+        pool = bound.pool
+        # NullPool (DB_POOL_MODE=transaction) não mantém conexões: o pool fica no pgbouncer.
+        if not hasattr(pool, "checkedout"):
+            continue
+        labels = (("engine", label),)
+        size.append((labels, pool.size()))
+        checked_out.append((labels, pool.checkedout()))
+        overflow.append((labels, max(pool.overflow(), 0)))
+    return [
+        ("db_pool_size", "gauge", "Conexões permanentes do pool (DB_POOL_SIZE).", size),
+        ("db_pool_checked_out", "gauge", "Conexões do pool em uso.", checked_out),
+        ("db_pool_overflow", "gauge", "Conexões abertas além de DB_POOL_SIZE.", overflow),
+    ]
+
+
+def _password_hash_metrics():
+    stats = password_executor.stats()
+    return [
+        ("password_hash_workers", "gauge", "Threads dedicadas ao bcrypt.", [((), stats["workers"])]),
+        ("password_hash_active", "gauge", "Hashes bcrypt em execução.", [((), stats["active"])]),
+        ("password_hash_queued", "gauge", "Hashes bcrypt aguardando na fila.", [((), stats["queued"])]),
+        (
+            "password_hash_rejected_total",
+            "counter",
+            "Hashes recusados com a fila cheia (503).",
+            [((), stats["rejected"])],
+        ),
+    ]
+
+
+def _cache_metrics():
+    stats = user_cache.stats()
+    total = stats["hits"] + stats["misses"]
+    requests = [
+        ((("cache", "user"), ("result", "hit")), stats["hits"]),
+        ((("cache", "user"), ("result", "miss")), stats["misses"]),
+    ]
+    ratios = [((("cache", "user"),), stats["hits"] / total if total else 0.0)]
+    # O cache de consultas já conta hits/misses em query_cache_requests_total.
+    for namespace in (DASHBOARD_SUMMARY_CACHE, CATEGORIES_CACHE):
+        ratios.append(((("cache", namespace),), query_cache.hit_rate(namespace)))
+    return [
+        ("cache_requests_total", "counter", "Consultas aos caches em memória por resultado.", requests),
+        ("cache_hit_ratio", "gauge", "Fração de consultas atendidas pelo cache desde o início do processo.", ratios),
+    ]
+
+
+register_collector(_pool_metrics)
+register_collector(_password_hash_metrics)
+register_collector(_cache_metrics)
+
+
+@router.get("/health")
+def health():
+    # Liveness: só confirma que o processo responde, sem tocar no banco.
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    # Readiness: o processo consegue obter uma conexão e consultar o banco.
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "detail": "Banco de dados indisponível"},
+        )
+    return {"status": "ok"}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    if not settings.enable_metrics:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Métricas desativadas")
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -1,49 +1,57 @@
-﻿from fastapi import APIRouter, Depends, HTTPException, status
+﻿import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError
 from app.application.schemas.auth import LoginRequest, RegisterRequest, TokenResponse
 from app.application.schemas.user import UserOut
-from app.application.use_cases.auth.authenticate import authenticate_user
-from app.application.use_cases.auth.register import register_user
+from app.application.use_cases.auth.authenticate import authenticate_user_async
+from app.application.use_cases.auth.register import register_user_async
 from app.core.config import get_settings
 from app.infrastructure.db.session import get_db
+from app.infrastructure.db.repositories.async_repositories import ThreadedRepository
 from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
 from app.infrastructure.security.jwt import create_access_token
-from app.infrastructure.security.password import get_password_hash, verify_password
+from app.infrastructure.security.password import get_password_hash_async, verify_password_async
 from app.presentation.deps import get_current_user
+from app.presentation.responses import InstrumentedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=InstrumentedRoute)
 settings = get_settings()
 
 
+# Endpoints async: o bcrypt é aguardado no pool dedicado sem ocupar uma thread do pool
+# das rotas síncronas; só as consultas ao banco rodam em threads, uma de cada vez.
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register(data: RegisterRequest, db=Depends(get_db)):
-    user_repo = UserRepositoryImpl(db)
+async def register(data: RegisterRequest, db=Depends(get_db)):
+    user_repo = ThreadedRepository(UserRepositoryImpl(db))
     try:
-        user = register_user(user_repo, data.email, data.password, get_password_hash)
+        user = await register_user_async(user_repo, data.email, data.password, get_password_hash_async)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     except IntegrityError:
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="E-mail já cadastrado")
-    return UserOut(**user.__dict__)
+    return UserOut(**user.as_dict())
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db=Depends(get_db)):
-    user_repo = UserRepositoryImpl(db)
+async def login(data: LoginRequest, db=Depends(get_db)):
+    user_repo = ThreadedRepository(UserRepositoryImpl(db))
     if settings.demo_mode and data.email == settings.demo_email and data.password == settings.demo_password:
-        user = user_repo.get_by_email(data.email)
+        user = await user_repo.get_by_email(data.email)
         if user and not user.is_active:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário inativo")
         if not user:
             try:
-                user = user_repo.create(email=data.email, hashed_password=get_password_hash(data.password))
+                hashed_password = await get_password_hash_async(data.password)
+                user = await user_repo.create(email=data.email, hashed_password=hashed_password)
             except IntegrityError:
-                db.rollback()
+                await asyncio.to_thread(db.rollback)
+                user = None
+            if not user:
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="E-mail já cadastrado")
         token = create_access_token(subject=str(user.id), expires_minutes=settings.access_token_expire_minutes)
         return TokenResponse(access_token=token, expires_in=settings.access_token_expire_minutes * 60)
-    user = authenticate_user(user_repo, data.email, data.password, verify_password)
+    user = await authenticate_user_async(user_repo, data.email, data.password, verify_password_async)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais inválidas")
     token = create_access_token(subject=str(user.id), expires_minutes=settings.access_token_expire_minutes)
@@ -52,4 +60,4 @@ def login(data: LoginRequest, db=Depends(get_db)):
 
 @router.get("/me", response_model=UserOut)
 def me(current_user=Depends(get_current_user)):
-    return UserOut(**current_user.__dict__)
+    return UserOut(**current_user.as_dict())
@@ -1,26 +1,32 @@
 ﻿from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from app.application.schemas.category import CategoryCreate, CategoryOut, CategoryUpdate
 from app.application.use_cases.categories.crud import create_category, delete_category, list_categories, update_category
+from app.core.config import get_settings
+from app.infrastructure.cache.query_cache import query_cache
 from app.infrastructure.db.session import get_db
 from app.infrastructure.db.repositories.category_repository_impl import CategoryRepositoryImpl
-from app.presentation.deps import get_current_user
+from app.presentation.deps import check_data_version, get_current_user
+from app.presentation.responses import FastJSONResponse, InstrumentedRoute, schema_rows
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(prefix="/categories", tags=["categories"], route_class=InstrumentedRoute)
+settings = get_settings()
 
 
-@router.get("", response_model=list[CategoryOut])
-def get_categories(db=Depends(get_db), current_user=Depends(get_current_user)):
+@router.get("", response_model=list[CategoryOut], dependencies=[Depends(check_data_version)])
+def get_categories(response: Response, db=Depends(get_db), current_user=Depends(get_current_user)):
     repo = CategoryRepositoryImpl(db)
-    categories = list_categories(repo, current_user.id)
-    return [CategoryOut(**c.__dict__) for c in categories]
+    categories = list_categories(repo, current_user.id, query_cache)
+    if settings.fast_json:
+        return FastJSONResponse(schema_rows(categories, CategoryOut), headers=response.headers)
+    return [CategoryOut(**c.as_dict()) for c in categories]
 
 
 @router.post("", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
 def create(data: CategoryCreate, db=Depends(get_db), current_user=Depends(get_current_user)):
     repo = CategoryRepositoryImpl(db)
     category = create_category(repo, current_user.id, data.name, data.type)
-    return CategoryOut(**category.__dict__)
+    return CategoryOut(**category.as_dict())
 
 
 @router.put("/{category_id}", response_model=CategoryOut)
@@ -29,7 +35,7 @@ def update(category_id: UUID, data: CategoryUpdate, db=Depends(get_db), current_
     category = update_category(repo, current_user.id, category_id, data.name, data.type)
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada")
-    return CategoryOut(**category.__dict__)
+    return CategoryOut(**category.as_dict())
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,57 @@
+﻿from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from app.application.schemas.category import CategoryCreate, CategoryOut, CategoryUpdate
+from app.application.use_cases.categories.crud import (
+    create_category_async,
+    delete_category_async,
+    list_categories_async,
+    update_category_async,
+)
+from app.core.config import get_settings
+from app.infrastructure.cache.query_cache import query_cache
+from app.infrastructure.db.async_session import get_async_db
+from app.infrastructure.db.repositories.async_repositories import AsyncCategoryRepositoryImpl
+from app.presentation.deps import check_data_version_async, get_current_user_async
+from app.presentation.responses import FastJSONResponse, InstrumentedRoute, schema_rows
+
+router = APIRouter(prefix="/categories", tags=["categories"], route_class=InstrumentedRoute)
+settings = get_settings()
+
+
+@router.get("", response_model=list[CategoryOut], dependencies=[Depends(check_data_version_async)])
+async def get_categories(response: Response, db=Depends(get_async_db), current_user=Depends(get_current_user_async)):
+    repo = AsyncCategoryRepositoryImpl(db)
+    categories = await list_categories_async(repo, current_user.id, query_cache)
+    if settings.fast_json:
+        return FastJSONResponse(schema_rows(categories, CategoryOut), headers=response.headers)
+    return [CategoryOut(**c.as_dict()) for c in categories]
+
+
+@router.post("", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
+async def create(data: CategoryCreate, db=Depends(get_async_db), current_user=Depends(get_current_user_async)):
+    repo = AsyncCategoryRepositoryImpl(db)
+    category = await create_category_async(repo, current_user.id, data.name, data.type)
+    return CategoryOut(**category.as_dict())
+
+
+@router.put("/{category_id}", response_model=CategoryOut)
+async def update(
+    category_id: UUID,
+    data: CategoryUpdate,
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    repo = AsyncCategoryRepositoryImpl(db)
+    category = await update_category_async(repo, current_user.id, category_id, data.name, data.type)
+    if not category:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada")
+    return CategoryOut(**category.as_dict())
+
+
+@router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete(category_id: UUID, db=Depends(get_async_db), current_user=Depends(get_current_user_async)):
+    repo = AsyncCategoryRepositoryImpl(db)
+    success = await delete_category_async(repo, current_user.id, category_id)
+    if not success:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada")
+    return None
@@ -1,15 +1,24 @@
 ﻿from datetime import date
 from fastapi import APIRouter, Depends, Query
-from app.application.schemas.dashboard import DashboardSummary
+from app.application.schemas.dashboard import (
+    DashboardCategoryBreakdown,
+    DashboardSummary,
+    DashboardTimeseries,
+    TimeseriesGranularity,
+)
+from app.application.use_cases.dashboard.categories import get_dashboard_category_breakdown
 from app.application.use_cases.dashboard.summary import get_dashboard_summary
+from app.application.use_cases.dashboard.timeseries import get_dashboard_timeseries
+from app.infrastructure.cache.query_cache import query_cache
 from app.infrastructure.db.session import get_db
 from app.infrastructure.db.repositories.transaction_repository_impl import TransactionRepositoryImpl
-from app.presentation.deps import get_current_user
+from app.presentation.deps import check_data_version, get_current_user
+from app.presentation.responses import InstrumentedRoute
 
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=InstrumentedRoute)
 
 
-@router.get("/summary", response_model=DashboardSummary)
+@router.get("/summary", response_model=DashboardSummary, dependencies=[Depends(check_data_version)])
 def summary(
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
@@ -17,5 +26,31 @@ def summary(
     current_user=Depends(get_current_user),
 ):
     repo = TransactionRepositoryImpl(db)
-    result = get_dashboard_summary(repo, current_user.id, start_date, end_date)
+    result = get_dashboard_summary(repo, current_user.id, start_date, end_date, query_cache)
     return DashboardSummary(**result)
+
+
+@router.get("/timeseries", response_model=DashboardTimeseries)
+def timeseries(
+    granularity: TimeseriesGranularity = Query(default=TimeseriesGranularity.MONTH),
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    repo = TransactionRepositoryImpl(db)
+    result = get_dashboard_timeseries(repo, current_user.id, granularity.value, start_date, end_date)
+    return DashboardTimeseries(**result)
+
+
+@router.get("/categories", response_model=DashboardCategoryBreakdown)
+def categories(
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    top: int | None = Query(default=None, ge=1, le=100),
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    repo = TransactionRepositoryImpl(db)
+    result = get_dashboard_category_breakdown(repo, current_user.id, start_date, end_date, top)
+    return DashboardCategoryBreakdown(**result)
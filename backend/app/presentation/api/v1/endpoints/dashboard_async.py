@@ -0,0 +1,56 @@
+﻿from datetime import date
+from fastapi import APIRouter, Depends, Query
+from app.application.schemas.dashboard import (
+    DashboardCategoryBreakdown,
+    DashboardSummary,
+    DashboardTimeseries,
+    TimeseriesGranularity,
+)
+from app.application.use_cases.dashboard.categories import get_dashboard_category_breakdown_async
+from app.application.use_cases.dashboard.summary import get_dashboard_summary_async
+from app.application.use_cases.dashboard.timeseries import get_dashboard_timeseries_async
+from app.infrastructure.cache.query_cache import query_cache
+from app.infrastructure.db.async_session import get_async_db
+from app.infrastructure.db.repositories.async_repositories import AsyncTransactionRepositoryImpl
+from app.presentation.deps import check_data_version_async, get_current_user_async
+from app.presentation.responses import InstrumentedRoute
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=InstrumentedRoute)
+
+
+@router.get("/summary", response_model=DashboardSummary, dependencies=[Depends(check_data_version_async)])
+async def summary(
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    repo = AsyncTransactionRepositoryImpl(db)
+    result = await get_dashboard_summary_async(repo, current_user.id, start_date, end_date, query_cache)
+    return DashboardSummary(**result)
+
+
+@router.get("/timeseries", response_model=DashboardTimeseries)
+async def timeseries(
+    granularity: TimeseriesGranularity = Query(default=TimeseriesGranularity.MONTH),
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    repo = AsyncTransactionRepositoryImpl(db)
+    result = await get_dashboard_timeseries_async(repo, current_user.id, granularity.value, start_date, end_date)
+    return DashboardTimeseries(**result)
+
+
+@router.get("/categories", response_model=DashboardCategoryBreakdown)
+async def categories(
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    top: int | None = Query(default=None, ge=1, le=100),
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    repo = AsyncTransactionRepositoryImpl(db)
+    result = await get_dashboard_category_breakdown_async(repo, current_user.id, start_date, end_date, top)
+    return DashboardCategoryBreakdown(**result)
@@ -2,24 +2,54 @@
 import io
 from datetime import date
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile, status
 from fastapi.responses import StreamingResponse
-from app.application.schemas.transaction import TransactionCreate, TransactionOut, TransactionUpdate
+from sqlalchemy.orm import Session
+from app.application.schemas.transaction import (
+    TransactionBatchError,
+    TransactionBatchItem,
+    TransactionBatchRequest,
+    TransactionBatchResult,
+    TransactionCreate,
+    TransactionImportResult,
+    TransactionOut,
+    TransactionUpdate,
+)
+from app.application.use_cases.transactions.batch import apply_transaction_batch
+from app.application.use_cases.transactions.bulk_import import (
+    detect_import_format,
+    import_transactions,
+    parse_csv,
+    parse_ndjson,
+)
 from app.application.use_cases.transactions.crud import (
     create_transaction,
     delete_transaction,
-    list_transactions,
+    list_transactions_page,
+    stream_transactions,
     update_transaction,
 )
+from app.application.use_cases.transactions.export import EXPORT_CHUNK_SIZE, export_transactions_csv
 from app.core.config import get_settings
+from app.core.metrics import export_bytes_streamed
 from app.domain.entities.transaction import TransactionType
 from app.infrastructure.db.session import get_db
 from app.infrastructure.db.repositories.category_repository_impl import CategoryRepositoryImpl
 from app.infrastructure.db.repositories.transaction_repository_impl import TransactionRepositoryImpl
-from app.presentation.deps import get_current_user
+from app.presentation.deps import check_data_version, get_current_user
+from app.presentation.responses import (
+    NDJSON_MEDIA_TYPE,
+    FastJSONResponse,
+    InstrumentedRoute,
+    ndjson_chunks,
+    schema_rows,
+)
 
-router = APIRouter(prefix="/transactions", tags=["transactions"])
+router = APIRouter(prefix="/transactions", tags=["transactions"], route_class=InstrumentedRoute)
 settings = get_settings()
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 
 def _validate_category(db, user_id, category_id: UUID | None):
@@ -31,23 +61,62 @@ def _validate_category(db, user_id, category_id: UUID | None):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Categoria inválida")
 
 
-@router.get("", response_model=list[TransactionOut])
+@router.get("", response_model=list[TransactionOut], dependencies=[Depends(check_data_version)])
 def get_transactions(
+    response: Response,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     type: TransactionType | None = Query(default=None),
     category_id: UUID | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    accept: str | None = Header(default=None),
     db=Depends(get_db),
     current_user=Depends(get_current_user),
 ):
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        # Sessão própria para o streaming, como na exportação CSV.
+        stream_db = Session(bind=db.get_bind(), autoflush=False)
+        return ndjson_response(stream_db, current_user.id, start_date, end_date, type, category_id, cursor)
     repo = TransactionRepositoryImpl(db)
-    transactions = list_transactions(repo, current_user.id, start_date, end_date, type, category_id)
-    return [TransactionOut(**t.__dict__) for t in transactions]
+    try:
+        transactions, next_cursor = list_transactions_page(
+            repo, current_user.id, start_date, end_date, type, category_id, limit, cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if settings.fast_json:
+        # Entidades direto para JSON, sem construir e revalidar um TransactionOut por linha.
+        response = FastJSONResponse(schema_rows(transactions, TransactionOut), headers=response.headers)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response if settings.fast_json else [TransactionOut(**t.as_dict()) for t in transactions]
+
+
+def ndjson_response(stream_db, user_id, start_date, end_date, type, category_id, cursor):
+    # Histórico completo (limit é ignorado; cursor permite retomar), uma linha JSON
+    # por lançamento, lido por um cursor no servidor com memória constante.
+    try:
+        batches = stream_transactions(
+            TransactionRepositoryImpl(stream_db), user_id, start_date, end_date, type, category_id, cursor
+        )
+    except ValueError as exc:
+        stream_db.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    def generate():
+        try:
+            for chunk in ndjson_chunks(batches, TransactionOut, EXPORT_CHUNK_SIZE):
+                export_bytes_streamed.inc(len(chunk), format="ndjson")
+                yield chunk
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.post("", response_model=TransactionOut, status_code=status.HTTP_201_CREATED)
 def create(data: TransactionCreate, db=Depends(get_db), current_user=Depends(get_current_user)):
-    _validate_category(db, current_user.id, data.category_id)
     repo = TransactionRepositoryImpl(db)
     transaction = create_transaction(
         repo,
@@ -58,12 +127,68 @@ def create(data: TransactionCreate, db=Depends(get_db), current_user=Depends(get
         data.description,
         data.date,
     )
-    return TransactionOut(**transaction.__dict__)
+    if not transaction:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Categoria inválida")
+    return TransactionOut(**transaction.as_dict())
+
+
+@router.post("/batch", response_model=TransactionBatchResult)
+def batch(data: TransactionBatchRequest, db=Depends(get_db), current_user=Depends(get_current_user)):
+    results, errors = apply_transaction_batch(
+        TransactionRepositoryImpl(db),
+        CategoryRepositoryImpl(db),
+        current_user.id,
+        data.operations,
+    )
+    if errors:
+        # Lote tudo-ou-nada: com qualquer operação inválida nada é aplicado.
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "error_count": len(errors),
+                "errors": [TransactionBatchError(**error).model_dump(mode="json") for error in errors],
+            },
+        )
+    items = [
+        TransactionBatchItem(
+            index=result["index"],
+            op=result["op"],
+            id=result["id"],
+            transaction=TransactionOut(**result["transaction"].as_dict()) if result["transaction"] else None,
+        )
+        for result in results
+    ]
+    return TransactionBatchResult(items=items)
+
+
+@router.post("/import", response_model=TransactionImportResult)
+def import_file(file: UploadFile = File(...), db=Depends(get_db), current_user=Depends(get_current_user)):
+    try:
+        file_format = detect_import_format(file.filename, file.content_type)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    records = parse_csv(stream) if file_format == "csv" else parse_ndjson(stream)
+    try:
+        result = import_transactions(
+            TransactionRepositoryImpl(db),
+            CategoryRepositoryImpl(db),
+            current_user.id,
+            records,
+        )
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo ilegível")
+    if result["error_count"]:
+        # Importação tudo-ou-nada: com qualquer linha inválida nada é gravado.
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=TransactionImportResult(**result).model_dump(),
+        )
+    return TransactionImportResult(**result)
 
 
 @router.put("/{transaction_id}", response_model=TransactionOut)
 def update(transaction_id: UUID, data: TransactionUpdate, db=Depends(get_db), current_user=Depends(get_current_user)):
-    _validate_category(db, current_user.id, data.category_id)
     repo = TransactionRepositoryImpl(db)
     transaction = update_transaction(
         repo,
@@ -76,8 +201,10 @@ def update(transaction_id: UUID, data: TransactionUpdate, db=Depends(get_db), cu
         data.date,
     )
     if not transaction:
+        # Sem linha atualizada: ou o lançamento não existe ou a categoria é inválida.
+        _validate_category(db, current_user.id, data.category_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lançamento não encontrado")
-    return TransactionOut(**transaction.__dict__)
+    return TransactionOut(**transaction.as_dict())
 
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -100,31 +227,30 @@ def export_csv(
 ):
     if not settings.enable_csv_export:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Exportação CSV desativada")
-    repo = TransactionRepositoryImpl(db)
-    transactions = list_transactions(repo, current_user.id, start_date, end_date, type, category_id)
+    # Sessão própria para o streaming: a sessão da dependência pode ser fechada
+    # antes de a resposta terminar de ser enviada.
+    stream_db = Session(bind=db.get_bind(), autoflush=False)
+    repo = TransactionRepositoryImpl(stream_db)
+    chunks = export_transactions_csv(
+        repo,
+        current_user.id,
+        start_date,
+        end_date,
+        type,
+        category_id,
+        engine=settings.csv_export_engine,
+        chunk_size=EXPORT_CHUNK_SIZE,
+    )
 
     def generate():
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["id", "categoria_id", "tipo", "valor", "descricao", "data"])
-        yield output.getvalue()
-        output.seek(0)
-        output.truncate(0)
-
-        for t in transactions:
-            writer.writerow(
-                [
-                    str(t.id),
-                    str(t.category_id) if t.category_id else "",
-                    t.type.value,
-                    f"{t.amount:.2f}",
-                    t.description or "",
-                    t.date.isoformat(),
-                ]
-            )
-            yield output.getvalue()
-            output.seek(0)
-            output.truncate(0)
+        try:
+            for chunk in chunks:
+                # O motor "python" gera str; codifica aqui para contar os bytes enviados.
+                data = chunk.encode() if isinstance(chunk, str) else chunk
+                export_bytes_streamed.inc(len(data), format="csv")
+                yield data
+        finally:
+            stream_db.close()
 
     headers = {"Content-Disposition": "attachment; filename=transacoes.csv"}
     return StreamingResponse(generate(), media_type="text/csv", headers=headers)
@@ -0,0 +1,150 @@
+﻿from datetime import date
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.application.schemas.transaction import TransactionCreate, TransactionOut, TransactionUpdate
+from app.application.use_cases.transactions.crud import (
+    create_transaction_async,
+    delete_transaction_async,
+    list_transactions_page_async,
+    stream_transactions_async,
+    update_transaction_async,
+)
+from app.application.use_cases.transactions.export import EXPORT_CHUNK_SIZE
+from app.core.config import get_settings
+from app.core.metrics import export_bytes_streamed
+from app.domain.entities.transaction import TransactionType
+from app.infrastructure.db.async_session import get_async_db
+from app.infrastructure.db.repositories.async_repositories import (
+    AsyncCategoryRepositoryImpl,
+    AsyncTransactionRepositoryImpl,
+)
+from app.presentation.api.v1.endpoints.transactions import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+)
+from app.presentation.deps import check_data_version_async, get_current_user_async
+from app.presentation.responses import (
+    NDJSON_MEDIA_TYPE,
+    FastJSONResponse,
+    InstrumentedRoute,
+    ndjson_chunks_async,
+    schema_rows,
+)
+
+router = APIRouter(prefix="/transactions", tags=["transactions"], route_class=InstrumentedRoute)
+settings = get_settings()
+
+
+async def _validate_category(db, user_id, category_id: UUID | None):
+    if not category_id:
+        return
+    category = await AsyncCategoryRepositoryImpl(db).get_by_id(category_id, user_id)
+    if not category:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Categoria inválida")
+
+
+@router.get("", response_model=list[TransactionOut], dependencies=[Depends(check_data_version_async)])
+async def get_transactions(
+    response: Response,
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    type: TransactionType | None = Query(default=None),
+    category_id: UUID | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    accept: str | None = Header(default=None),
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        # Sessão própria para o streaming, no mesmo engine da requisição.
+        stream_db = AsyncSession(bind=db.bind, autoflush=False)
+        return await ndjson_response_async(stream_db, current_user.id, start_date, end_date, type, category_id, cursor)
+    repo = AsyncTransactionRepositoryImpl(db)
+    try:
+        transactions, next_cursor = await list_transactions_page_async(
+            repo, current_user.id, start_date, end_date, type, category_id, limit, cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if settings.fast_json:
+        # Entidades direto para JSON, sem construir e revalidar um TransactionOut por linha.
+        response = FastJSONResponse(schema_rows(transactions, TransactionOut), headers=response.headers)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response if settings.fast_json else [TransactionOut(**t.as_dict()) for t in transactions]
+
+
+async def ndjson_response_async(stream_db, user_id, start_date, end_date, type, category_id, cursor):
+    # Como ndjson_response, mas com o cursor no servidor lido pela conexão assíncrona.
+    try:
+        batches = stream_transactions_async(
+            AsyncTransactionRepositoryImpl(stream_db), user_id, start_date, end_date, type, category_id, cursor
+        )
+    except ValueError as exc:
+        await stream_db.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    async def generate():
+        try:
+            async for chunk in ndjson_chunks_async(batches, TransactionOut, EXPORT_CHUNK_SIZE):
+                export_bytes_streamed.inc(len(chunk), format="ndjson")
+                yield chunk
+        finally:
+            await stream_db.close()
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post("", response_model=TransactionOut, status_code=status.HTTP_201_CREATED)
+async def create(data: TransactionCreate, db=Depends(get_async_db), current_user=Depends(get_current_user_async)):
+    repo = AsyncTransactionRepositoryImpl(db)
+    transaction = await create_transaction_async(
+        repo,
+        current_user.id,
+        data.category_id,
+        data.type,
+        data.amount,
+        data.description,
+        data.date,
+    )
+    if not transaction:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Categoria inválida")
+    return TransactionOut(**transaction.as_dict())
+
+
+@router.put("/{transaction_id}", response_model=TransactionOut)
+async def update(
+    transaction_id: UUID,
+    data: TransactionUpdate,
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    repo = AsyncTransactionRepositoryImpl(db)
+    transaction = await update_transaction_async(
+        repo,
+        current_user.id,
+        transaction_id,
+        data.category_id,
+        data.type,
+        data.amount,
+        data.description,
+        data.date,
+    )
+    if not transaction:
+        # Sem linha atualizada: ou o lançamento não existe ou a categoria é inválida.
+        await _validate_category(db, current_user.id, data.category_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lançamento não encontrado")
+    return TransactionOut(**transaction.as_dict())
+
+
+@router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete(transaction_id: UUID, db=Depends(get_async_db), current_user=Depends(get_current_user_async)):
+    repo = AsyncTransactionRepositoryImpl(db)
+    success = await delete_transaction_async(repo, current_user.id, transaction_id)
+    if not success:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lançamento não encontrado")
+    return None
@@ -1,8 +1,39 @@
 ﻿from fastapi import APIRouter
-from app.presentation.api.v1.endpoints import auth, categories, transactions, dashboard
+from app.core.config import get_settings
+from app.presentation.api.v1.endpoints import (
+    auth,
+    categories,
+    categories_async,
+    dashboard,
+    dashboard_async,
+    transactions,
+    transactions_async,
+)
+
+settings = get_settings()
+
+
+def _without(router: APIRouter, replacement: APIRouter) -> APIRouter:
+    # Mantém apenas as rotas síncronas que não têm versão assíncrona (ex.: exportação CSV).
+    taken = {(route.path, method) for route in replacement.routes for method in route.methods}
+    remaining = APIRouter()
+    remaining.routes.extend(
+        route for route in router.routes if not any((route.path, method) in taken for method in route.methods)
+    )
+    return remaining
+
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
-api_router.include_router(categories.router)
-api_router.include_router(transactions.router)
-api_router.include_router(dashboard.router)
+if settings.db_async:
+    for sync_module, async_module in (
+        (categories, categories_async),
+        (transactions, transactions_async),
+        (dashboard, dashboard_async),
+    ):
+        api_router.include_router(async_module.router)
+        api_router.include_router(_without(sync_module.router, async_module.router))
+else:
+    api_router.include_router(categories.router)
+    api_router.include_router(transactions.router)
+    api_router.include_router(dashboard.router)
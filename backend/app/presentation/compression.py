@@ -0,0 +1,146 @@
+﻿import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    # Qualidade (q) de cada codificação do Accept-Encoding; q inválido conta como 0.
+    accepted = {}
+    for item in header.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.lower()] = quality
+    return accepted
+
+
+def _quality(accepted: dict[str, float], name: str) -> float:
+    # "*" vale para as codificações não listadas; "gzip;q=0, *" exclui só o gzip.
+    return accepted.get(name, accepted.get("*", 0.0))
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31: formato gzip (cabeçalho + CRC) em vez de zlib puro.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Z_SYNC_FLUSH entrega ao cliente tudo o que já foi comprimido.
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    # Comprime com Brotli (quando instalado) ou gzip. Respostas em streaming são
+    # comprimidas bloco a bloco, com flush a cada bloco, sem acumular o corpo.
+    def __init__(self, app, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoder(self, scope):
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        names = ("br", "gzip") if brotli is not None else ("gzip",)
+        # Maior q entre as suportadas; no empate, Brotli.
+        name = max(names, key=lambda name: _quality(accepted, name))
+        if _quality(accepted, name) <= 0:
+            return None
+        if name == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoder = self._encoder(scope)
+        if encoder is None:
+
+            async def send_uncompressed(message):
+                # Sem compressão para este cliente, mas a resposta depende do Accept-Encoding:
+                # o Vary impede que um cache a entregue a quem aceita compressão.
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    if "content-encoding" not in headers:
+                        headers.add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_uncompressed)
+            return
+
+        start_message = None
+        compressing = None
+
+        async def send_compressed(message):
+            nonlocal start_message, compressing
+            if message["type"] == "http.response.start":
+                # Os cabeçalhos só saem quando o primeiro bloco do corpo define se vale comprimir.
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressing is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if "content-encoding" in headers:
+                    compressing = False
+                else:
+                    # Comprimida ou não (corpo pequeno), a resposta varia com o Accept-Encoding.
+                    headers.add_vary_header("Accept-Encoding")
+                    compressing = more_body or len(body) >= self.minimum_size
+                if not compressing:
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers["content-encoding"] = encoder.name
+                if more_body:
+                    del headers["content-length"]
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": encoder.chunk(body), "more_body": True})
+                    return
+                body = encoder.finish(body)
+                headers["content-length"] = str(len(body))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            if not compressing:
+                await send(message)
+                return
+            data = encoder.chunk(body) if more_body else encoder.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,20 +1,25 @@
-﻿from uuid import UUID
-from fastapi import Depends, HTTPException, status
+﻿import hashlib
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, Response, status
 from jose import JWTError
 from jose.exceptions import ExpiredSignatureError
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import get_settings
+from app.infrastructure.cache.user_cache import user_cache
+from app.infrastructure.db.async_session import get_async_db
 from app.infrastructure.db.session import get_db
+from app.infrastructure.db.repositories.async_repositories import AsyncUserRepositoryImpl
 from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
 from app.infrastructure.security.jwt import decode_access_token
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_v1_str}/auth/login")
 UNAUTHORIZED_HEADERS = {"WWW-Authenticate": "Bearer"}
+# O navegador guarda a resposta, mas sempre revalida com If-None-Match.
+ETAG_CACHE_CONTROL = "private, no-cache"
 
 
-def get_current_user(db=Depends(get_db), token: str = Depends(oauth2_scheme)):
-    # Valida o JWT e retorna o usuário associado ao token.
+def _user_id_from_token(token: str) -> UUID:
     try:
         payload = decode_access_token(token)
     except ExpiredSignatureError:
@@ -43,15 +48,16 @@ def get_current_user(db=Depends(get_db), token: str = Depends(oauth2_scheme)):
             headers=UNAUTHORIZED_HEADERS,
         )
     try:
-        user_id = UUID(subject)
+        return UUID(subject)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido",
             headers=UNAUTHORIZED_HEADERS,
         )
-    user_repo = UserRepositoryImpl(db)
-    user = user_repo.get_by_id(user_id)
+
+
+def _ensure_active(user):
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,3 +71,66 @@ def get_current_user(db=Depends(get_db), token: str = Depends(oauth2_scheme)):
             headers=UNAUTHORIZED_HEADERS,
         )
     return user
+
+
+def get_current_user(db=Depends(get_db), token: str = Depends(oauth2_scheme)):
+    # Valida o JWT e retorna o usuário associado ao token.
+    user_id = _user_id_from_token(token)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = UserRepositoryImpl(db).get_by_id(user_id)
+        if user:
+            user_cache.set(user_id, user)
+    return _ensure_active(user)
+
+
+async def get_current_user_async(db=Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    user_id = _user_id_from_token(token)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await AsyncUserRepositoryImpl(db).get_by_id(user_id)
+        if user:
+            user_cache.set(user_id, user)
+    return _ensure_active(user)
+
+
+def _data_version_etag(request: Request, user_id: UUID, version: int) -> str:
+    # Mesma versão dos dados, mesma URL e mesmo Accept: mesmo conteúdo.
+    key = f"{user_id}:{version}:{request.url.path}?{request.url.query}:{request.headers.get('accept', '')}"
+    return f'W/"{version}-{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _check_data_version(request: Request, response: Response, user_id: UUID, version: int | None):
+    etag = _data_version_etag(request, user_id, version or 0)
+    headers = {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        # 304 antes de qualquer consulta de listagem ou agregação.
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+def check_data_version(
+    request: Request,
+    response: Response,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    version = UserRepositoryImpl(db).get_data_version(current_user.id)
+    _check_data_version(request, response, current_user.id, version)
+
+
+async def check_data_version_async(
+    request: Request,
+    response: Response,
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    version = await AsyncUserRepositoryImpl(db).get_data_version(current_user.id)
+    _check_data_version(request, response, current_user.id, version)
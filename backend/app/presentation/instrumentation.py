@@ -0,0 +1,104 @@
+﻿import logging
+from starlette.datastructures import MutableHeaders
+from app.core.instrumentation import end_request, start_request
+from app.core.metrics import http_request_duration_seconds, http_requests_in_flight
+
+logger = logging.getLogger("app.request")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def _route(scope) -> str:
+    # Template da rota (ex.: /api/v1/transactions/{transaction_id}) para não criar
+    # uma série por id; requisições sem rota correspondente ficam agrupadas.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(stats) -> str:
+    return ", ".join(
+        (
+            f'db;dur={_ms(stats.db_seconds)};desc="{stats.statements} SQL"',
+            f"map;dur={_ms(stats.mapping_seconds)}",
+            f"ser;dur={_ms(stats.serialization_seconds)}",
+            f"app;dur={_ms(stats.elapsed())}",
+        )
+    )
+
+
+class InstrumentationMiddleware:
+    # Mede cada requisição: comandos e tempo de banco (hooks do engine), mapeamento de
+    # linhas e serialização. Os valores até o início da resposta vão no Server-Timing;
+    # o log, emitido ao fim (inclusive de streamings), traz os totais.
+    def __init__(self, app, slow_request_ms: int = 1000, server_timing: bool = True):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request()
+        status_code = 500
+        http_requests_in_flight.inc()
+
+        async def send_instrumented(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_instrumented)
+        finally:
+            end_request(token)
+            http_requests_in_flight.dec()
+            http_request_duration_seconds.observe(
+                stats.elapsed(), method=scope["method"], route=_route(scope), status=status_code
+            )
+            self._log(scope, status_code, stats)
+
+    def _log(self, scope, status_code: int, stats) -> None:
+        duration_ms = _ms(stats.elapsed())
+        fields = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": duration_ms,
+            "db_ms": _ms(stats.db_seconds),
+            "db_statements": stats.statements,
+            "mapping_ms": _ms(stats.mapping_seconds),
+            "serialization_ms": _ms(stats.serialization_seconds),
+        }
+        if self.slow_request_ms and duration_ms >= self.slow_request_ms:
+            slowest = [
+                {"ms": _ms(seconds), "statement": statement} for seconds, statement in stats.slowest_statements()
+            ]
+            logger.warning(
+                "Requisição lenta: %s %s %s em %.1f ms (%d comandos SQL, %.1f ms no banco); mais lentos:\n%s",
+                scope["method"],
+                scope["path"],
+                status_code,
+                duration_ms,
+                stats.statements,
+                fields["db_ms"],
+                "\n".join(f"[{item['ms']} ms] {item['statement']}" for item in slowest),
+                extra={**fields, "sql": slowest},
+            )
+            return
+        # Requisições normais só em DEBUG: em produção o log fica com as lentas.
+        logger.debug(
+            "%s %s %s em %.1f ms (%d comandos SQL)",
+            scope["method"],
+            scope["path"],
+            status_code,
+            duration_ms,
+            stats.statements,
+            extra=fields,
+        )
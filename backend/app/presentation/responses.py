@@ -0,0 +1,99 @@
+﻿from decimal import Decimal
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from app.core.instrumentation import timed
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(value):
+    # orjson não serializa Decimal: vai como string, mantendo as casas decimais
+    # (mesmo formato do Pydantic).
+    if isinstance(value, Decimal):
+        return format(value, "f")
+    raise TypeError
+
+
+class InstrumentedJSONResponse(JSONResponse):
+    # JSON padrão; o tempo de render entra no tempo de serialização da requisição.
+    def render(self, content) -> bytes:
+        with timed("serialization_seconds"):
+            return super().render(content)
+
+
+class _TimedResponseField:
+    # Campo do response_model com validação e serialização cronometradas. O FastAPI as
+    # executa fora do endpoint e antes do render, em serialize_response.
+    def __init__(self, field):
+        self._field = field
+
+    def __getattr__(self, name):
+        return getattr(self._field, name)
+
+    def validate(self, *args, **kwargs):
+        with timed("serialization_seconds"):
+            return self._field.validate(*args, **kwargs)
+
+    def serialize(self, *args, **kwargs):
+        with timed("serialization_seconds"):
+            return self._field.serialize(*args, **kwargs)
+
+
+class InstrumentedRoute(APIRoute):
+    # route_class dos routers: o tempo de serialização do Server-Timing passa a incluir o
+    # response_model, não só o render da resposta.
+    def get_route_handler(self):
+        if self.secure_cloned_response_field is not None:
+            self.secure_cloned_response_field = _TimedResponseField(self.secure_cloned_response_field)
+        return super().get_route_handler()
+
+
+class FastJSONResponse(JSONResponse):
+    # UUID, date/datetime e Enum são tratados nativamente pelo orjson.
+    def render(self, content) -> bytes:
+        with timed("serialization_seconds"):
+            return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def _rows(entities, fields: tuple) -> list[dict]:
+    return [{field: getattr(entity, field) for field in fields} for entity in entities]
+
+
+def schema_rows(entities, schema) -> list[dict]:
+    # Só os campos do schema de saída, sem construir/validar um modelo por linha.
+    with timed("serialization_seconds"):
+        return _rows(entities, tuple(schema.model_fields))
+
+
+def _append_ndjson(buffer: bytearray, batch, fields: tuple) -> None:
+    with timed("serialization_seconds"):
+        for row in _rows(batch, fields):
+            buffer += orjson.dumps(row, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE)
+
+
+def ndjson_chunks(batches, schema, chunk_size: int):
+    # Uma linha JSON por entidade, agrupadas em blocos de ~chunk_size bytes: cada
+    # bloco só é gerado quando o servidor termina de enviar o anterior.
+    fields = tuple(schema.model_fields)
+    buffer = bytearray()
+    for batch in batches:
+        _append_ndjson(buffer, batch, fields)
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def ndjson_chunks_async(batches, schema, chunk_size: int):
+    # Mesmo formato de ndjson_chunks, sobre um gerador assíncrono de lotes.
+    fields = tuple(schema.model_fields)
+    buffer = bytearray()
+    async for batch in batches:
+        _append_ndjson(buffer, batch, fields)
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
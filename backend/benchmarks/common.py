@@ -0,0 +1,77 @@
+﻿from __future__ import annotations
+
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.session import engine
+
+# Os rótulos do enum dependem de como o schema foi criado (Alembic ou create_all),
+# por isso income/expense são lidos de enum_range na ordem de declaração.
+INCOME = "(enum_range(NULL::transaction_type))[1]"
+EXPENSE = "(enum_range(NULL::transaction_type))[2]"
+
+
+def seed_user_transactions(conn, user_id: uuid.UUID, rows: int) -> None:
+    conn.execute(
+        text("INSERT INTO users (id, email, hashed_password, is_active) VALUES (:id, :email, 'x', true)"),
+        {"id": user_id, "email": f"bench_{user_id.hex}@example.com"},
+    )
+    started = time.perf_counter()
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO transactions (id, user_id, category_id, type, amount, description, date)
+            SELECT
+                gen_random_uuid(),
+                :user_id,
+                NULL,
+                CASE WHEN random() < 0.4 THEN {INCOME} ELSE {EXPENSE} END,
+                round((random() * 5000)::numeric, 2),
+                'lançamento ' || g,
+                date '2020-01-01' + (random() * 2000)::int
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"user_id": user_id, "rows": rows},
+    )
+    print(f"Seed: {rows} linhas em {time.perf_counter() - started:.1f}s")
+
+
+@contextmanager
+def seeded_session(rows: int):
+    # Tudo roda numa transação desfeita ao final: nenhum dado de benchmark fica no banco.
+    user_id = uuid.uuid4()
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            seed_user_transactions(conn, user_id, rows)
+            with Session(bind=conn, autoflush=False) as db:
+                yield db, user_id
+        finally:
+            trans.rollback()
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    del result
+    return elapsed
+
+
+def peak_memory(fn) -> int:
+    # Pico de memória alocada (bytes) durante fn; medido à parte porque o
+    # tracemalloc deixa o código bem mais lento.
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak
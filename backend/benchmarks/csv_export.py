@@ -0,0 +1,43 @@
+﻿from __future__ import annotations
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.application.use_cases.transactions.export import export_transactions_csv
+from app.infrastructure.db.repositories.transaction_repository_impl import TransactionRepositoryImpl
+from benchmarks.common import seeded_session
+
+
+def run(db: Session, user_id: uuid.UUID, engine_name: str, rows: int) -> None:
+    repo = TransactionRepositoryImpl(db)
+    started = time.perf_counter()
+    first_chunk = None
+    total = 0
+    for chunk in export_transactions_csv(repo, user_id, None, None, None, None, engine=engine_name):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - started
+        total += len(chunk.encode() if isinstance(chunk, str) else chunk)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{engine_name:>6}: {elapsed:.2f}s | {rows / elapsed:,.0f} linhas/s | "
+        f"{total / elapsed / 1024 / 1024:.1f} MB/s | primeiro bloco em {first_chunk * 1000:.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara a exportação CSV via COPY com a via csv.writer.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with seeded_session(args.rows) as (db, user_id):
+        for _ in range(args.repeat):
+            for engine_name in ("python", "copy"):
+                run(db, user_id, engine_name, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+﻿from __future__ import annotations
+
+import argparse
+import dataclasses
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from app.domain.entities.transaction import Transaction, TransactionType
+from benchmarks.common import peak_memory
+
+# Mesma entidade sem __slots__, como era antes, para comparação.
+DictTransaction = dataclasses.make_dataclass(
+    "DictTransaction",
+    [(field.name, field.type) for field in dataclasses.fields(Transaction)],
+    frozen=True,
+)
+
+
+def _rows(count: int) -> list[tuple]:
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    return [
+        (
+            uuid.uuid4(),
+            user_id,
+            None,
+            TransactionType.EXPENSE,
+            Decimal("10.00"),
+            f"lançamento {index}",
+            date(2026, 1, 1),
+            now,
+            now,
+        )
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara a memória das entidades com e sem __slots__.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    # As linhas (valores) são compartilhadas: a diferença medida é só o custo das instâncias.
+    rows = _rows(args.rows)
+    results = {}
+    for name, cls in (("dataclass com __dict__", DictTransaction), ("dataclass com __slots__", Transaction)):
+        results[name] = peak_memory(lambda: [cls(*row) for row in rows])
+        print(f"{name:<26} {results[name] / 1024:>10.1f} KB por {args.rows} linhas")
+    saved = results["dataclass com __dict__"] - results["dataclass com __slots__"]
+    print(f"economia: {saved / 1024:.1f} KB por {args.rows} linhas ({saved / args.rows:.0f} bytes por linha)")
+
+
+if __name__ == "__main__":
+    main()
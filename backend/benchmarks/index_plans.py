@@ -0,0 +1,117 @@
+﻿from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.infrastructure.db.session import engine
+
+SCHEMA = "bench_indexes"
+ROWS_PER_USER = 5000
+
+BASELINE_INDEXES = [
+    f"CREATE INDEX ON {SCHEMA}.transactions (user_id)",
+    f"CREATE INDEX ON {SCHEMA}.transactions (date)",
+]
+
+COMPOSITE_INDEXES = [
+    f"CREATE INDEX ON {SCHEMA}.transactions (user_id, date DESC, created_at DESC, id DESC)",
+    f"CREATE INDEX ON {SCHEMA}.transactions (user_id, type, date) INCLUDE (amount)",
+]
+
+# Os rótulos do enum dependem de como o schema foi criado (Alembic ou create_all),
+# por isso income/expense são lidos de enum_range na ordem de declaração.
+INCOME = "(enum_range(NULL::transaction_type))[1]"
+EXPENSE = "(enum_range(NULL::transaction_type))[2]"
+
+# Mesmas formas de consulta usadas em TransactionRepositoryImpl.
+QUERIES = {
+    "list_page": f"""
+        SELECT * FROM {SCHEMA}.transactions
+        WHERE user_id = :user_id
+        ORDER BY date DESC, created_at DESC, id DESC
+        LIMIT 51
+    """,
+    "list_filtered": f"""
+        SELECT * FROM {SCHEMA}.transactions
+        WHERE user_id = :user_id AND type = {EXPENSE} AND date BETWEEN :start_date AND :end_date
+        ORDER BY date DESC, created_at DESC, id DESC
+        LIMIT 51
+    """,
+    "summary_income": f"""
+        SELECT coalesce(sum(amount), 0) FROM {SCHEMA}.transactions
+        WHERE user_id = :user_id AND type = {INCOME} AND date BETWEEN :start_date AND :end_date
+    """,
+}
+
+
+def _user_id(index: int) -> str:
+    return f"00000000-0000-0000-0000-{index:012x}"
+
+
+def seed(conn, rows: int) -> None:
+    users = max(rows // ROWS_PER_USER, 1)
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.transactions (LIKE public.transactions INCLUDING DEFAULTS)"))
+    started = time.perf_counter()
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO {SCHEMA}.transactions
+                (id, user_id, category_id, type, amount, description, date, created_at, updated_at)
+            SELECT
+                gen_random_uuid(),
+                ('00000000-0000-0000-0000-' || lpad(to_hex(g % :users), 12, '0'))::uuid,
+                NULL,
+                CASE WHEN random() < 0.4 THEN {INCOME} ELSE {EXPENSE} END,
+                round((random() * 5000)::numeric, 2),
+                'lançamento ' || g,
+                date '2020-01-01' + (random() * 2000)::int,
+                now() - random() * interval '2000 days',
+                now()
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"users": users, "rows": rows},
+    )
+    print(f"Seed: {rows} linhas para {users} usuários em {time.perf_counter() - started:.1f}s")
+
+
+def create_indexes(conn, statements: list[str]) -> None:
+    for statement in statements:
+        conn.execute(text(statement))
+    # VACUUM atualiza o visibility map, necessário para index-only scans.
+    conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.transactions"))
+
+
+def explain_all(conn, label: str) -> None:
+    params = {"user_id": _user_id(1), "start_date": "2022-01-01", "end_date": "2022-12-31"}
+    print(f"\n===== {label} =====")
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars().all()
+        print(f"\n--- {name}")
+        print("\n".join(plan))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara planos de consulta antes/depois dos índices compostos.")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--keep", action="store_true", help="mantém o schema de benchmark ao final")
+    args = parser.parse_args()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        seed(conn, args.rows)
+        try:
+            create_indexes(conn, BASELINE_INDEXES)
+            explain_all(conn, "índices simples (0001_initial)")
+            create_indexes(conn, COMPOSITE_INDEXES)
+            explain_all(conn, "índices compostos (0002_composite_indexes)")
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+﻿from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.application.schemas.transaction import TransactionOut
+from app.infrastructure.db.models.transaction_model import TransactionModel
+from app.infrastructure.db.repositories.mappers import (
+    TRANSACTION_COLUMNS,
+    transaction_model_to_entity,
+    transaction_row_to_entity,
+)
+from benchmarks.common import peak_memory, seeded_session, timed
+
+
+def _orm_models(db: Session, user_id):
+    return db.execute(select(TransactionModel).where(TransactionModel.user_id == user_id)).scalars().all()
+
+
+def _core_rows(db: Session, user_id):
+    return db.execute(select(*TRANSACTION_COLUMNS).where(TransactionModel.user_id == user_id)).all()
+
+
+def layers(db: Session, user_id):
+    # Cada camada parte do zero (identity map vazio) para medir o caminho completo.
+    def orm_models():
+        db.expunge_all()
+        return _orm_models(db, user_id)
+
+    def orm_entities():
+        db.expunge_all()
+        return [transaction_model_to_entity(model) for model in _orm_models(db, user_id)]
+
+    def core_rows():
+        return _core_rows(db, user_id)
+
+    def core_entities():
+        return [transaction_row_to_entity(row) for row in _core_rows(db, user_id)]
+
+    def core_dicts():
+        return [row._asdict() for row in _core_rows(db, user_id)]
+
+    def core_schemas():
+        # Caminho completo do GET /transactions até o schema de resposta.
+        return [TransactionOut(**t.as_dict()) for t in core_entities()]
+
+    return {
+        "orm: modelos": orm_models,
+        "orm: modelos -> entidades": orm_entities,
+        "core: linhas": core_rows,
+        "core: linhas -> entidades": core_entities,
+        "core: linhas -> dicts": core_dicts,
+        "core: entidades -> TransactionOut": core_schemas,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede linhas/s e pico de memória de cada camada de leitura.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with seeded_session(args.rows) as (db, user_id):
+        print(f"{'camada':<34} {'linhas/s':>12} {'pico (MB)':>10}")
+        for name, fn in layers(db, user_id).items():
+            elapsed = min(timed(fn) for _ in range(args.repeat))
+            peak = peak_memory(fn)
+            print(f"{name:<34} {args.rows / elapsed:>12,.0f} {peak / 1024 / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
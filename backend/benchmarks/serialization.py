@@ -0,0 +1,70 @@
+﻿from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.application.schemas.transaction import TransactionOut
+from app.domain.entities.transaction import Transaction, TransactionType
+from app.presentation.responses import FastJSONResponse, schema_rows
+
+response_adapter = TypeAdapter(list[TransactionOut])
+
+
+def _entities(count: int) -> list[Transaction]:
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    return [
+        Transaction(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            category_id=uuid.uuid4() if index % 2 else None,
+            type=TransactionType.EXPENSE if index % 3 else TransactionType.INCOME,
+            amount=Decimal(f"{index % 5000}.{index % 100:02d}"),
+            description=f"lançamento {index}",
+            date=date(2026, 1, 1 + index % 28),
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def _pydantic_response(entities, response_class):
+    # O que o FastAPI faz com response_model: constrói os schemas no endpoint,
+    # revalida na saída, serializa em modo json e renderiza.
+    models = [TransactionOut(**t.as_dict()) for t in entities]
+    validated = response_adapter.validate_python(models)
+    return response_class(response_adapter.dump_python(validated, mode="json")).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede a vazão de serialização da listagem de lançamentos.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    entities = _entities(args.rows)
+    paths = {
+        "response_model + json": lambda: _pydantic_response(entities, JSONResponse),
+        "response_model + orjson": lambda: _pydantic_response(entities, FastJSONResponse),
+        "schema_rows + orjson (FAST_JSON)": lambda: FastJSONResponse(schema_rows(entities, TransactionOut)).body,
+    }
+    print(f"{'caminho':<34} {'linhas/s':>12} {'ms':>8} {'KB':>8}")
+    for name, fn in paths.items():
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            body = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:<34} {args.rows / best:>12,.0f} {best * 1000:>8.1f} {len(body) / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+﻿from __future__ import annotations
+
+import argparse
+from uuid import UUID
+
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.db.repositories.daily_balance_repository_impl import DailyBalanceRepositoryImpl
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Regenera a tabela daily_balances a partir de transactions.")
+    parser.add_argument("--user-id", type=UUID, default=None, help="limita a reconstrução a um usuário")
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="só remove os dias sem lançamentos, sem regenerar nem bloquear escritas",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        repo = DailyBalanceRepositoryImpl(db)
+        if args.prune:
+            repo.prune([args.user_id] if args.user_id else None)
+            db.commit()
+            print("Dias sem lançamentos removidos de daily_balances.")
+            return
+        repo.rebuild(user_id=args.user_id)
+        print("Rollup daily_balances regenerado com sucesso.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from app.infrastructure.security.password import get_password_hash
 from app.infrastructure.db.models.user_model import UserModel
 from app.infrastructure.db.models.category_model import CategoryModel
 from app.infrastructure.db.models.transaction_model import TransactionModel
+from app.infrastructure.db.repositories.daily_balance_repository_impl import DailyBalanceRepositoryImpl
 from app.domain.entities.category import CategoryType
 from app.domain.entities.transaction import TransactionType
 
@@ -81,6 +82,8 @@ def seed_transactions(db, user_id, categories: dict[str, CategoryModel]) -> None
             )
         )
     db.commit()
+    # Os lançamentos do seed não passam pelo repositório; recalcula o rollup do usuário.
+    DailyBalanceRepositoryImpl(db).rebuild(user_id=user_id)
 
 
 def main() -> None:
@@ -1,4 +1,6 @@
 ﻿import os
+import time
+from contextlib import contextmanager
 
 import pytest
 from sqlalchemy import create_engine, event
@@ -19,6 +21,7 @@ app_config.Settings.model_config["env_file"] = None
 app_config.get_settings.cache_clear()
 
 from app.core.config import get_settings
+from app.infrastructure.db.instrumentation import instrument_engine
 from app.infrastructure.db.session import get_db
 from app.main import app
 
@@ -33,7 +36,9 @@ def api_prefix():
 
 @pytest.fixture(scope="session")
 def db_engine():
-    return create_engine(settings.database_url, pool_pre_ping=True)
+    engine = create_engine(settings.database_url, pool_pre_ping=True)
+    instrument_engine(engine)
+    return engine
 
 
 @pytest.fixture
@@ -57,6 +62,26 @@ def db_session(db_engine):
         connection.close()
 
 
+@pytest.fixture
+def count_queries(db_engine):
+    # Conta os comandos enviados ao banco, ignorando o controle de savepoint do fixture.
+    @contextmanager
+    def _count():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if not statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+                statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count
+
+
 @pytest.fixture
 def client(db_session):
     def _get_db_override():
@@ -69,3 +94,30 @@ def client(db_session):
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+class FakeRedis:
+    # Subconjunto do cliente redis-py usado pelo RedisCacheBackend, em memória.
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self.get(key) is not None:
+            return None
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
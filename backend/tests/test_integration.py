@@ -126,6 +126,19 @@ def test_auth_register_returns_user_schema(client, api_prefix):
     assert data["is_active"] is True
 
 
+def test_auth_register_rejects_duplicate_email_before_hashing(client, api_prefix, monkeypatch):
+    from app.infrastructure.security import password
+
+    payload = {"email": _new_email(), "password": "secret123"}
+    assert client.post(f"{api_prefix}/auth/register", json=payload).status_code == 201
+    executor = password.BoundedExecutor(workers=1, queue_size=0)
+    monkeypatch.setattr(password, "password_executor", executor)
+    response = client.post(f"{api_prefix}/auth/register", json=payload)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "E-mail já cadastrado"
+    assert executor.stats()["completed"] == 0
+
+
 def test_auth_login_returns_token_schema(client, api_prefix):
     email = _new_email()
     password = "secret123"
@@ -314,3 +327,1120 @@ def test_dashboard_summary(client, api_prefix):
     assert Decimal(str(summary["total_income"])) == Decimal("100.00")
     assert Decimal(str(summary["total_expense"])) == Decimal("40.00")
     assert Decimal(str(summary["balance"])) == Decimal("60.00")
+    assert summary["transaction_count"] == 2
+
+
+def test_transactions_cursor_pagination(client, api_prefix):
+    headers, _ = _register_and_login(client, api_prefix)
+    created_ids = set()
+    for day in range(1, 6):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": None,
+                "type": "expense",
+                "amount": "10.00",
+                "description": f"Item {day}",
+                "date": date(2026, 1, day).isoformat(),
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        created_ids.add(resp.json()["id"])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"{api_prefix}/transactions", params=params, headers=headers)
+        assert page.status_code == 200
+        items = page.json()
+        assert len(items) <= 2
+        for item in items:
+            _assert_transaction_schema(item)
+        seen.extend(items)
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert {item["id"] for item in seen} == created_ids
+    assert len(seen) == len(created_ids)
+    assert [item["date"] for item in seen] == sorted((item["date"] for item in seen), reverse=True)
+
+    # Sem limit, a listagem usa a página padrão; o histórico completo fica com NDJSON e CSV.
+    operations = [{"op": "create", "type": "expense", "amount": "1.00", "date": "2026-02-01"}] * 50
+    batch = client.post(f"{api_prefix}/transactions/batch", json={"operations": operations}, headers=headers)
+    assert batch.status_code == 200
+    default_page = client.get(f"{api_prefix}/transactions", headers=headers)
+    assert len(default_page.json()) == 50
+    assert "X-Next-Cursor" in default_page.headers
+
+    invalid = client.get(f"{api_prefix}/transactions", params={"cursor": "invalido"}, headers=headers)
+    assert invalid.status_code == 400
+
+
+def test_fast_json_list_responses_match_default_serialization(client, api_prefix, monkeypatch):
+    from app.core.config import get_settings
+    from app.presentation.responses import FastJSONResponse
+
+    headers, _ = _register_and_login(client, api_prefix)
+    category = client.post(f"{api_prefix}/categories", json={"name": "Serviços", "type": "both"}, headers=headers)
+    for amount in ("10.50", "1234.00", "0.01"):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={"category_id": category.json()["id"], "type": "income", "amount": amount, "date": "2026-06-01"},
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    params = {"limit": 2}
+    default_transactions = client.get(f"{api_prefix}/transactions", params=params, headers=headers)
+    default_categories = client.get(f"{api_prefix}/categories", headers=headers)
+    monkeypatch.setattr(get_settings(), "fast_json", True)
+    fast_transactions = client.get(f"{api_prefix}/transactions", params=params, headers=headers)
+    fast_categories = client.get(f"{api_prefix}/categories", headers=headers)
+
+    assert fast_transactions.json() == default_transactions.json()
+    assert fast_transactions.headers["X-Next-Cursor"] == default_transactions.headers["X-Next-Cursor"]
+    assert fast_categories.json() == default_categories.json()
+    for item in fast_transactions.json():
+        assert isinstance(item["amount"], str)
+        assert Decimal(item["amount"]).as_tuple().exponent == -2
+    assert FastJSONResponse(content={"amount": Decimal("5.00")}).body == b'{"amount":"5.00"}'
+
+
+def test_write_endpoints_use_a_single_statement(client, api_prefix, count_queries):
+    with count_queries() as statements:
+        register = client.post(
+            f"{api_prefix}/auth/register",
+            json={"email": _new_email(), "password": "secret123"},
+        )
+    assert register.status_code == 201
+    # Consulta do e-mail antes do bcrypt + INSERT ... ON CONFLICT.
+    assert len(statements) == 2
+
+    headers, _ = _register_and_login(client, api_prefix)
+    # Aquece o cache do usuário autenticado: só as escritas devem ir ao banco.
+    assert client.get(f"{api_prefix}/auth/me", headers=headers).status_code == 200
+
+    def write(method, path, expected=1, **kwargs):
+        with count_queries() as statements:
+            resp = client.request(method, f"{api_prefix}{path}", headers=headers, **kwargs)
+        assert len(statements) == expected, (method, path, statements)
+        return resp
+
+    category = write("POST", "/categories", json={"name": "Aluguel", "type": "expense"})
+    assert category.status_code == 201
+    category_id = category.json()["id"]
+    assert write("PUT", f"/categories/{category_id}", json={"name": "Moradia", "type": "expense"}).status_code == 200
+
+    payload = {"category_id": category_id, "type": "expense", "amount": "800.00", "date": "2026-05-05"}
+    transaction = write("POST", "/transactions", json=payload)
+    assert transaction.status_code == 201
+    transaction_id = transaction.json()["id"]
+    updated = write("PUT", f"/transactions/{transaction_id}", json={**payload, "amount": "850.00"})
+    assert updated.status_code == 200
+    assert Decimal(str(updated.json()["amount"])) == Decimal("850.00")
+
+    assert write("DELETE", f"/categories/{category_id}").status_code == 204
+    summary = client.get(f"{api_prefix}/dashboard/categories", headers=headers).json()
+    assert [item["category_id"] for item in summary["items"]] == [None]
+    # A exclusão zera o dia no rollup: um DELETE extra remove a linha vazia.
+    assert write("DELETE", f"/transactions/{transaction_id}", expected=2).status_code == 204
+    summary = client.get(f"{api_prefix}/dashboard/summary", headers=headers).json()
+    assert summary["transaction_count"] == 0
+
+    invalid = client.post(
+        f"{api_prefix}/transactions",
+        json={**payload, "category_id": str(uuid4())},
+        headers=headers,
+    )
+    assert invalid.status_code == 400
+    missing = client.put(f"{api_prefix}/transactions/{uuid4()}", json={**payload, "category_id": None}, headers=headers)
+    assert missing.status_code == 404
+
+
+def test_reads_return_304_while_data_version_is_unchanged(client, api_prefix, count_queries):
+    headers, _ = _register_and_login(client, api_prefix)
+    routes = ["/transactions", "/categories", "/dashboard/summary"]
+    etags = {}
+    for route in routes:
+        resp = client.get(f"{api_prefix}{route}", headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["etag"].startswith('W/"0-')
+        etags[route] = resp.headers["etag"]
+    assert len(set(etags.values())) == 3
+
+    with count_queries() as statements:
+        for route in routes:
+            resp = client.get(f"{api_prefix}{route}", headers={**headers, "If-None-Match": etags[route]})
+            assert resp.status_code == 304
+            assert resp.headers["etag"] == etags[route]
+            assert resp.content == b""
+    assert not any("transactions" in sql or "categories" in sql or "daily_balances" in sql for sql in statements)
+
+    # Escrita sem efeito não muda a versão.
+    missing = client.delete(f"{api_prefix}/transactions/00000000-0000-0000-0000-000000000001", headers=headers)
+    assert missing.status_code == 404
+    unchanged = client.get(f"{api_prefix}/categories", headers={**headers, "If-None-Match": etags["/categories"]})
+    assert unchanged.status_code == 304
+
+    category = client.post(f"{api_prefix}/categories", json={"name": "Vendas", "type": "income"}, headers=headers)
+    assert category.status_code == 201
+    for route in routes:
+        resp = client.get(f"{api_prefix}{route}", headers={**headers, "If-None-Match": etags[route]})
+        assert resp.status_code == 200
+        assert resp.headers["etag"].startswith('W/"1-')
+        etags[route] = resp.headers["etag"]
+
+    created = client.post(
+        f"{api_prefix}/transactions",
+        json={"category_id": None, "type": "income", "amount": "5.00", "description": None, "date": "2026-05-01"},
+        headers=headers,
+    )
+    assert created.status_code == 201
+    summary = client.get(
+        f"{api_prefix}/dashboard/summary",
+        headers={**headers, "If-None-Match": etags["/dashboard/summary"]},
+    )
+    assert summary.status_code == 200
+    assert summary.json()["total_income"] == "5.00"
+
+
+def test_dashboard_summary_and_categories_are_cached_until_a_write(client, api_prefix, count_queries):
+    headers, _ = _register_and_login(client, api_prefix)
+    category = client.post(f"{api_prefix}/categories", json={"name": "Vendas", "type": "income"}, headers=headers)
+    assert category.status_code == 201
+    assert client.get(f"{api_prefix}/dashboard/summary", headers=headers).json()["transaction_count"] == 0
+    assert len(client.get(f"{api_prefix}/categories", headers=headers).json()) == 1
+
+    with count_queries() as statements:
+        assert client.get(f"{api_prefix}/dashboard/summary", headers=headers).json()["transaction_count"] == 0
+        assert len(client.get(f"{api_prefix}/categories", headers=headers).json()) == 1
+    assert not any("daily_balances" in sql or "FROM categories" in sql for sql in statements)
+
+    created = client.post(
+        f"{api_prefix}/transactions",
+        json={"category_id": None, "type": "income", "amount": "7.00", "description": None, "date": "2026-05-02"},
+        headers=headers,
+    )
+    assert created.status_code == 201
+    assert client.get(f"{api_prefix}/dashboard/summary", headers=headers).json()["transaction_count"] == 1
+    client.put(
+        f"{api_prefix}/categories/{category.json()['id']}",
+        json={"name": "Serviços", "type": "income"},
+        headers=headers,
+    )
+    assert [c["name"] for c in client.get(f"{api_prefix}/categories", headers=headers).json()] == ["Serviços"]
+
+
+@pytest.mark.parametrize("backend_name", ["memory", "redis"])
+def test_query_cache_invalidation_and_single_flight(backend_name, fake_redis):
+    import asyncio
+    import threading
+    import time
+    import uuid
+    from app.infrastructure.cache.backends import MemoryCacheBackend, RedisCacheBackend
+    from app.infrastructure.cache.query import QueryCache
+
+    if backend_name == "memory":
+        backend = MemoryCacheBackend(maxsize=100, ttl_seconds=60)
+    else:
+        backend = RedisCacheBackend(fake_redis, ttl_seconds=60)
+    cache = QueryCache(backend)
+    user_id = uuid.uuid4()
+    loads = []
+
+    def load():
+        loads.append(1)
+        time.sleep(0.05)
+        return {"loads": len(loads)}
+
+    assert cache.get_or_load("summary", user_id, ("2026-01-01", None), load) == {"loads": 1}
+    assert cache.get_or_load("summary", user_id, ("2026-01-01", None), load) == {"loads": 1}
+    assert cache.get_or_load("summary", user_id, (None, None), load) == {"loads": 2}
+    cache.invalidate(user_id, "summary")
+
+    # Após a invalidação, cargas concorrentes da mesma chave rodam uma única consulta.
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("summary", user_id, (None, None), load)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [{"loads": 3}] * 8
+    assert len(loads) == 3
+
+    async def load_async():
+        loads.append(1)
+        await asyncio.sleep(0.05)
+        return len(loads)
+
+    async def concurrent_loads():
+        cache.invalidate(user_id, "categories")
+        return await asyncio.gather(
+            *(cache.get_or_load_async("categories", user_id, (), load_async) for _ in range(8))
+        )
+
+    assert asyncio.run(concurrent_loads()) == [4] * 8
+    assert len(loads) == 4
+
+
+def test_transactions_batch_applies_all_operations(client, api_prefix):
+    headers, _ = _register_and_login(client, api_prefix)
+    category = client.post(
+        f"{api_prefix}/categories",
+        json={"name": "Fornecedores", "type": "expense"},
+        headers=headers,
+    ).json()
+    existing = []
+    for amount in ("100.00", "200.00"):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={"type": "expense", "amount": amount, "date": "2026-04-01"},
+            headers=headers,
+        )
+        existing.append(resp.json())
+
+    operations = [
+        {"op": "create", "type": "income", "amount": "500.00", "description": "Contrato", "date": "2026-04-02"},
+        {
+            "op": "update",
+            "id": existing[0]["id"],
+            "category_id": category["id"],
+            "type": "expense",
+            "amount": "150.00",
+            "description": "Ajustado",
+            "date": "2026-04-03",
+        },
+        {"op": "delete", "id": existing[1]["id"]},
+        {"op": "create", "category_id": category["id"], "type": "expense", "amount": "25.00", "date": "2026-04-04"},
+    ]
+    resp = client.post(f"{api_prefix}/transactions/batch", json={"operations": operations}, headers=headers)
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert [(item["index"], item["op"]) for item in items] == [(0, "create"), (1, "update"), (2, "delete"), (3, "create")]
+    _assert_transaction_schema(items[0]["transaction"])
+    assert items[0]["transaction"]["description"] == "Contrato"
+    assert items[1]["id"] == existing[0]["id"]
+    assert Decimal(str(items[1]["transaction"]["amount"])) == Decimal("150.00")
+    assert items[1]["transaction"]["category_id"] == category["id"]
+    assert items[2] == {"index": 2, "op": "delete", "id": existing[1]["id"], "transaction": None}
+    assert items[3]["transaction"]["category_id"] == category["id"]
+
+    listed = client.get(f"{api_prefix}/transactions", headers=headers).json()
+    assert {item["id"] for item in listed} == {existing[0]["id"], items[0]["id"], items[3]["id"]}
+    summary = client.get(f"{api_prefix}/dashboard/summary", headers=headers).json()
+    assert Decimal(str(summary["total_income"])) == Decimal("500.00")
+    assert Decimal(str(summary["total_expense"])) == Decimal("175.00")
+    assert summary["transaction_count"] == 3
+
+    rejected = client.post(
+        f"{api_prefix}/transactions/batch",
+        json={
+            "operations": [
+                {"op": "create", "type": "income", "amount": "1.00", "date": "2026-04-05"},
+                {"op": "delete", "id": existing[1]["id"]},
+                {"op": "create", "category_id": str(uuid4()), "type": "income", "amount": "1.00", "date": "2026-04-05"},
+                {"op": "delete", "id": existing[0]["id"]},
+                {"op": "delete", "id": existing[0]["id"]},
+            ]
+        },
+        headers=headers,
+    )
+    assert rejected.status_code == 422
+    detail = rejected.json()["detail"]
+    assert detail["error_count"] == 3
+    assert [error["index"] for error in detail["errors"]] == [1, 2, 4]
+    assert len(client.get(f"{api_prefix}/transactions", headers=headers).json()) == 3
+
+
+def test_batch_and_import_check_category_ownership_in_the_database(client, api_prefix, db_session, count_queries):
+    import uuid
+    from app.infrastructure.db.models.category_model import CategoryModel
+
+    headers, _ = _register_and_login(client, api_prefix)
+    user_id = client.get(f"{api_prefix}/auth/me", headers=headers).json()["id"]
+    category_id = client.post(
+        f"{api_prefix}/categories", json={"name": "Vendas", "type": "income"}, headers=headers
+    ).json()["id"]
+
+    def _batch(category):
+        operations = [
+            {"op": "create", "category_id": category, "type": "income", "amount": "1.00", "date": "2026-06-01"}
+        ]
+        return client.post(f"{api_prefix}/transactions/batch", json={"operations": operations}, headers=headers)
+
+    with count_queries() as statements:
+        assert _batch(category_id).status_code == 200
+    # O lote não lê a lista de categorias, só trava as que referencia.
+    category_reads = [sql for sql in statements if "FROM categories" in sql]
+    assert len(category_reads) == 1 and "FOR KEY SHARE" in category_reads[0]
+
+    # Categoria gravada por fora (como por outro processo).
+    external = CategoryModel(id=uuid.uuid4(), user_id=uuid.UUID(user_id), name="Externa", type="income")
+    db_session.add(external)
+    db_session.commit()
+    assert _batch(str(external.id)).status_code == 200
+    csv_body = f"categoria_id,tipo,valor,descricao,data\n{external.id},income,3.00,,2026-06-02\n"
+    imported = client.post(
+        f"{api_prefix}/transactions/import",
+        files={"file": ("lancamentos.csv", csv_body.encode(), "text/csv")},
+        headers=headers,
+    )
+    assert imported.json() == {"imported": 1, "error_count": 0, "errors": []}
+
+    assert client.delete(f"{api_prefix}/categories/{category_id}", headers=headers).status_code == 204
+    rejected = _batch(category_id)
+    assert rejected.status_code == 422
+    assert rejected.json()["detail"]["errors"] == [{"index": 0, "message": "Categoria inválida"}]
+    csv_body = "categoria_id,tipo,valor,descricao,data\n,income,1.00,,2026-06-03\n"
+    csv_body += f"{category_id},income,2.00,,2026-06-03\n"
+    imported = client.post(
+        f"{api_prefix}/transactions/import",
+        files={"file": ("lancamentos.csv", csv_body.encode(), "text/csv")},
+        headers=headers,
+    )
+    assert imported.status_code == 422
+    assert imported.json()["detail"]["errors"] == [{"line": 3, "message": "Categoria inválida"}]
+
+    # Categoria excluída por fora (como por outro processo): lote e importação são
+    # recusados pela conferência no banco, sem erro de FK.
+    db_session.delete(external)
+    db_session.commit()
+    rejected = _batch(str(external.id))
+    assert rejected.status_code == 422
+    assert rejected.json()["detail"]["errors"] == [{"index": 0, "message": "Categoria inválida"}]
+    csv_body = f"categoria_id,tipo,valor,descricao,data\n{external.id},income,3.00,,2026-06-02\n"
+    imported = client.post(
+        f"{api_prefix}/transactions/import",
+        files={"file": ("lancamentos.csv", csv_body.encode(), "text/csv")},
+        headers=headers,
+    )
+    assert imported.status_code == 422
+    assert imported.json()["detail"] == {
+        "imported": 0,
+        "error_count": 1,
+        "errors": [{"line": 2, "message": "Categoria inválida"}],
+    }
+
+
+def test_transactions_import_csv_and_ndjson(client, api_prefix):
+    headers, _ = _register_and_login(client, api_prefix)
+    category = client.post(
+        f"{api_prefix}/categories",
+        json={"name": "Vendas", "type": "income"},
+        headers=headers,
+    )
+    assert category.status_code == 201
+    category_id = category.json()["id"]
+
+    csv_body = "categoria_id,tipo,valor,descricao,data\n"
+    csv_body += "".join(f"{category_id},income,{day}.25,Venda {day},2026-03-{day:02d}\n" for day in range(1, 11))
+    csv_body += ",expense,40.00,,2026-03-15\n"
+    imported = client.post(
+        f"{api_prefix}/transactions/import",
+        files={"file": ("lancamentos.csv", csv_body.encode(), "text/csv")},
+        headers=headers,
+    )
+    assert imported.status_code == 200
+    assert imported.json() == {"imported": 11, "error_count": 0, "errors": []}
+
+    listed = client.get(f"{api_prefix}/transactions", params={"limit": 100}, headers=headers)
+    assert len(listed.json()) == 11
+    for item in listed.json():
+        _assert_transaction_schema(item)
+    summary = client.get(f"{api_prefix}/dashboard/summary", headers=headers).json()
+    assert Decimal(str(summary["total_income"])) == Decimal("57.50")
+    assert Decimal(str(summary["total_expense"])) == Decimal("40.00")
+    assert summary["transaction_count"] == 11
+
+    ndjson_body = "\n".join(
+        [
+            '{"type": "expense", "amount": "10.00", "date": "2026-03-20"}',
+            '{"type": "expense", "amount": "-1", "date": "2026-03-20"}',
+            "nao e json",
+            f'{{"category_id": "{uuid4()}", "type": "income", "amount": "5.00", "date": "2026-03-21"}}',
+        ]
+    )
+    rejected = client.post(
+        f"{api_prefix}/transactions/import",
+        files={"file": ("lancamentos.ndjson", ndjson_body.encode(), "application/x-ndjson")},
+        headers=headers,
+    )
+    assert rejected.status_code == 422
+    detail = rejected.json()["detail"]
+    assert detail["imported"] == 0
+    assert detail["error_count"] == 3
+    assert [error["line"] for error in detail["errors"]] == [2, 3, 4]
+    assert detail["errors"][2]["message"] == "Categoria inválida"
+    listed = client.get(f"{api_prefix}/transactions", params={"limit": 100}, headers=headers)
+    assert len(listed.json()) == 11
+
+    unsupported = client.post(
+        f"{api_prefix}/transactions/import",
+        files={"file": ("lancamentos.xlsx", b"x", "application/octet-stream")},
+        headers=headers,
+    )
+    assert unsupported.status_code == 400
+
+
+@pytest.mark.parametrize("engine", ["copy", "python"])
+def test_transactions_export_csv_streams_filtered_rows(client, api_prefix, monkeypatch, engine):
+    from app.presentation.api.v1.endpoints import transactions as transactions_endpoint
+
+    monkeypatch.setattr(transactions_endpoint.settings, "enable_csv_export", True)
+    monkeypatch.setattr(transactions_endpoint.settings, "csv_export_engine", engine)
+    monkeypatch.setattr(transactions_endpoint, "EXPORT_CHUNK_SIZE", 256)
+    headers, _ = _register_and_login(client, api_prefix)
+    for day in range(1, 21):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": None,
+                "type": "income" if day % 2 else "expense",
+                "amount": f"{day}.50",
+                "description": f"Item {day}",
+                "date": date(2026, 2, day).isoformat(),
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    export = client.get(f"{api_prefix}/transactions/export", params={"type": "income"}, headers=headers)
+    assert export.status_code == 200
+    assert export.headers["content-type"].startswith("text/csv")
+    lines = export.text.strip().splitlines()
+    assert lines[0] == "id,categoria_id,tipo,valor,descricao,data"
+    rows = [line.split(",") for line in lines[1:]]
+    assert len(rows) == 10
+    assert {row[2] for row in rows} == {"income"}
+    assert rows[0][3:] == ["19.50", "Item 19", "2026-02-19"]
+    assert [row[5] for row in rows] == sorted((row[5] for row in rows), reverse=True)
+
+
+def test_csv_export_engines_produce_the_same_bytes(client, api_prefix, monkeypatch):
+    from app.presentation.api.v1.endpoints import transactions as transactions_endpoint
+
+    monkeypatch.setattr(transactions_endpoint.settings, "enable_csv_export", True)
+    headers, _ = _register_and_login(client, api_prefix)
+    category_id = client.post(
+        f"{api_prefix}/categories", json={"name": "Vendas", "type": "income"}, headers=headers
+    ).json()["id"]
+    descriptions = [None, "", "a,b", 'diz "oi"', "linha 1\nlinha 2", "cr\rx", " espaços ", "\\."]
+    for day, description in enumerate(descriptions, start=1):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": category_id if day % 2 else None,
+                "type": "income",
+                "amount": "1234.5",
+                "description": description,
+                "date": date(2026, 3, day).isoformat(),
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    exports = {}
+    for engine in ("copy", "python"):
+        monkeypatch.setattr(transactions_endpoint.settings, "csv_export_engine", engine)
+        exports[engine] = client.get(f"{api_prefix}/transactions/export", headers=headers).content
+    assert exports["copy"] == exports["python"]
+    assert exports["python"].startswith(b"id,categoria_id,tipo,valor,descricao,data\n")
+    assert b"\r\n" not in exports["python"]
+
+
+def test_python_csv_export_chunks_stay_near_chunk_size():
+    import uuid
+    from app.application.use_cases.transactions.export import export_transactions_csv
+    from app.domain.entities.transaction import TransactionType
+
+    row = (uuid.uuid4(), None, TransactionType.INCOME, Decimal("10.00"), "Item", date(2026, 1, 1))
+
+    class _Repo:
+        def iter_export_rows(self, **filters):
+            yield [row] * 2000
+
+    chunks = list(
+        export_transactions_csv(_Repo(), uuid.uuid4(), None, None, None, None, engine="python", chunk_size=1024)
+    )
+    # A partição de 2000 linhas sai em vários blocos, cada um com no máximo uma linha além do limite.
+    assert len(chunks) > 50
+    assert all(1024 <= len(chunk) < 1024 + 100 for chunk in chunks[:-1])
+
+
+def test_transactions_ndjson_streams_filtered_rows(client, api_prefix, monkeypatch):
+    import json
+    from app.presentation.api.v1.endpoints import transactions as transactions_endpoint
+
+    monkeypatch.setattr(transactions_endpoint, "EXPORT_CHUNK_SIZE", 256)
+    headers, _ = _register_and_login(client, api_prefix)
+    for day in range(1, 21):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": None,
+                "type": "income" if day % 2 else "expense",
+                "amount": f"{day}.50",
+                "description": f"Item {day}",
+                "date": date(2026, 3, day).isoformat(),
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    params = {"type": "income", "start_date": "2026-03-05"}
+    stream = client.get(
+        f"{api_prefix}/transactions",
+        params={**params, "limit": 1},
+        headers={**headers, "Accept": "application/x-ndjson"},
+    )
+    assert stream.status_code == 200
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in stream.text.splitlines()]
+    listed = client.get(f"{api_prefix}/transactions", params={**params, "limit": 500}, headers=headers).json()
+    assert len(rows) == 8
+    assert rows == listed
+
+    invalid = client.get(
+        f"{api_prefix}/transactions",
+        params={"cursor": "invalido"},
+        headers={**headers, "Accept": "application/x-ndjson"},
+    )
+    assert invalid.status_code == 400
+
+
+def test_responses_are_gzip_compressed(client, api_prefix, monkeypatch):
+    from app.presentation.api.v1.endpoints import transactions as transactions_endpoint
+
+    monkeypatch.setattr(transactions_endpoint.settings, "enable_csv_export", True)
+    headers, _ = _register_and_login(client, api_prefix)
+    for day in range(1, 21):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": None,
+                "type": "income",
+                "amount": "10.00",
+                "description": "Venda",
+                "date": date(2026, 4, day).isoformat(),
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        assert "content-encoding" not in resp.headers
+
+    gzip_headers = {**headers, "Accept-Encoding": "gzip"}
+    listed = client.get(f"{api_prefix}/transactions", headers=gzip_headers)
+    assert listed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in listed.headers["vary"]
+    assert len(listed.json()) == 20
+    assert int(listed.headers["content-length"]) < len(listed.content)
+
+    identity = client.get(f"{api_prefix}/transactions", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == listed.json()
+    # Sem compressão (cliente não aceita ou corpo pequeno), o Vary continua na resposta.
+    assert "Accept-Encoding" in identity.headers["vary"]
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["vary"]
+
+    wildcard = client.get(f"{api_prefix}/transactions", headers={**headers, "Accept-Encoding": "*"})
+    assert wildcard.headers["content-encoding"] in ("br", "gzip")
+    excluded = client.get(f"{api_prefix}/transactions", headers={**headers, "Accept-Encoding": "gzip;q=0, *"})
+    assert excluded.headers.get("content-encoding") != "gzip"
+    assert excluded.json() == listed.json()
+
+    export = client.get(f"{api_prefix}/transactions/export", headers=gzip_headers)
+    assert export.headers["content-encoding"] == "gzip"
+    assert "content-length" not in export.headers
+    assert len(export.text.strip().splitlines()) == 21
+
+
+def test_requests_report_server_timing_and_slow_sql(client, api_prefix, monkeypatch, caplog):
+    import logging
+    from app.presentation.instrumentation import InstrumentationMiddleware
+
+    headers, _ = _register_and_login(client, api_prefix)
+    for day in range(1, 4):
+        client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": None,
+                "type": "income",
+                "amount": "1.00",
+                "description": None,
+                "date": f"2026-07-0{day}",
+            },
+            headers=headers,
+        )
+
+    with caplog.at_level(logging.DEBUG, logger="app.request"):
+        resp = client.get(f"{api_prefix}/transactions", headers=headers)
+    assert resp.status_code == 200
+    timings = dict(item.strip().split(";", 1) for item in resp.headers["server-timing"].split(","))
+    assert set(timings) == {"db", "map", "ser", "app"}
+    assert 'desc="2 SQL"' in timings["db"]
+    record = caplog.records[-1]
+    assert record.levelno == logging.DEBUG
+    assert (record.method, record.path, record.status, record.db_statements) == ("GET", "/api/v1/transactions", 200, 2)
+    assert record.mapping_ms >= 0 and record.serialization_ms >= 0
+
+    middleware = client.app.middleware_stack
+    while not isinstance(middleware, InstrumentationMiddleware):
+        middleware = middleware.app
+    monkeypatch.setattr(middleware, "slow_request_ms", 0.001)
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="app.request"):
+        client.get(f"{api_prefix}/dashboard/summary", headers=headers)
+    record = caplog.records[-1]
+    assert record.levelno == logging.WARNING
+    assert any("daily_balances" in item["statement"] for item in record.sql)
+    assert [item["ms"] for item in record.sql] == sorted((item["ms"] for item in record.sql), reverse=True)
+    assert "daily_balances" in record.getMessage()
+
+
+def test_entity_columns_match_entity_fields():
+    from dataclasses import fields
+    from app.domain.entities.category import Category
+    from app.domain.entities.transaction import Transaction
+    from app.domain.entities.user import User
+    from app.infrastructure.db.repositories import mappers
+
+    # As linhas Core viram entidades por nome: cada coluna precisa de um campo homônimo.
+    for columns, entity in (
+        (mappers.USER_COLUMNS, User),
+        (mappers.CATEGORY_COLUMNS, Category),
+        (mappers.TRANSACTION_COLUMNS, Transaction),
+    ):
+        assert {column.key for column in columns} == {field.name for field in fields(entity)}
+
+
+def test_server_timing_counts_response_model_serialization():
+    import time
+    from fastapi import APIRouter, FastAPI
+    from fastapi.testclient import TestClient
+    from pydantic import BaseModel, field_validator
+    from app.presentation.instrumentation import InstrumentationMiddleware
+    from app.presentation.responses import InstrumentedJSONResponse, InstrumentedRoute
+
+    class SlowOut(BaseModel):
+        value: int
+
+        @field_validator("value")
+        @classmethod
+        def _slow(cls, value):
+            time.sleep(0.05)
+            return value
+
+    router = APIRouter(route_class=InstrumentedRoute)
+
+    @router.get("/slow", response_model=SlowOut)
+    def slow():
+        return {"value": 1}
+
+    app = FastAPI(default_response_class=InstrumentedJSONResponse)
+    app.include_router(router)
+    app.add_middleware(InstrumentationMiddleware, slow_request_ms=0)
+    resp = TestClient(app).get("/slow")
+    timings = dict(item.strip().split(";", 1) for item in resp.headers["server-timing"].split(","))
+    # A validação do response_model (feita pelo FastAPI fora do endpoint) entra em "ser".
+    assert float(timings["ser"].removeprefix("dur=")) >= 50
+
+
+def test_health_ready_and_metrics_endpoints(client, api_prefix):
+    assert client.get("/health").json() == {"status": "ok"}
+    assert client.get("/ready").json() == {"status": "ok"}
+
+    def samples():
+        resp = client.get("/metrics")
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        return dict(line.rsplit(" ", 1) for line in resp.text.splitlines() if not line.startswith("#"))
+
+    before = samples()
+    headers, _ = _register_and_login(client, api_prefix)
+    client.post(
+        f"{api_prefix}/transactions",
+        json={"category_id": None, "type": "income", "amount": "1.00", "description": None, "date": "2026-07-01"},
+        headers=headers,
+    )
+    export = client.get(f"{api_prefix}/transactions/export", headers=headers)
+    after = samples()
+
+    route = '{method="POST",route="/api/v1/transactions",status="201"}'
+    assert float(after[f"http_request_duration_seconds_count{route}"]) == (
+        float(before.get(f"http_request_duration_seconds_count{route}", 0)) + 1
+    )
+    assert after['http_request_duration_seconds_bucket{method="GET",route="/health",status="200",le="+Inf"}']
+    # A própria coleta de /metrics está em andamento.
+    assert float(after["http_requests_in_flight"]) == 1
+    exported = float(after['export_bytes_streamed_total{format="csv"}'])
+    assert exported - float(before.get('export_bytes_streamed_total{format="csv"}', 0)) == len(export.content)
+    assert 'db_pool_size{engine="sync"}' in after
+    assert "password_hash_queued" in after
+    assert float(after['cache_requests_total{cache="user",result="hit"}']) > 0
+    assert 0 < float(after['cache_hit_ratio{cache="user"}']) <= 1
+
+
+def test_accept_encoding_qualities():
+    from app.presentation.compression import _accepted_encodings, _quality
+
+    accepted = _accepted_encodings("gzip;q=0.5, br ; q=0, *;q=0.1, deflate;q=x")
+    assert accepted == {"gzip": 0.5, "br": 0.0, "*": 0.1, "deflate": 0.0}
+    assert _quality(accepted, "zstd") == 0.1
+    assert _quality(_accepted_encodings("identity"), "gzip") == 0.0
+
+
+def test_compression_flushes_each_streamed_chunk():
+    import asyncio
+    import zlib
+    from app.presentation.compression import CompressionMiddleware
+
+    chunks = [b"linha %d\n" % i * 50 for i in range(3)]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/csv")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip, deflate")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=10_000)(scope, None, send))
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"gzip"
+    # Cada bloco enviado já é decodificável sozinho: nada fica preso no compressor.
+    decoder = zlib.decompressobj(31)
+    bodies = [message["body"] for message in sent[1:]]
+    for chunk, body in zip(chunks, bodies):
+        assert decoder.decompress(body) == chunk
+    decoder.decompress(bodies[-1])
+    assert decoder.eof
+
+
+def test_dashboard_summary_follows_updates_and_deletes(client, api_prefix, db_session, db_engine):
+    from sqlalchemy import delete, select, text
+    from sqlalchemy.orm import Session
+    from app.infrastructure.db.models.daily_balance_model import DailyBalanceModel
+    from app.infrastructure.db.repositories.daily_balance_repository_impl import DailyBalanceRepositoryImpl
+
+    headers, _ = _register_and_login(client, api_prefix)
+    category = client.post(
+        f"{api_prefix}/categories",
+        json={"name": "Vendas", "type": "income"},
+        headers=headers,
+    ).json()
+
+    def _create(type_, amount, day, category_id=None):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": category_id,
+                "type": type_,
+                "amount": amount,
+                "description": None,
+                "date": date(2026, 3, day).isoformat(),
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        return resp.json()
+
+    def _summary(**params):
+        resp = client.get(f"{api_prefix}/dashboard/summary", params=params, headers=headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        return Decimal(str(data["total_income"])), Decimal(str(data["total_expense"])), data["transaction_count"]
+
+    sale = _create("income", "300.00", 1, category["id"])
+    _create("income", "50.00", 1)
+    rent = _create("expense", "120.00", 2)
+    assert _summary() == (Decimal("350.00"), Decimal("120.00"), 3)
+
+    moved = client.put(
+        f"{api_prefix}/transactions/{rent['id']}",
+        json={"category_id": None, "type": "expense", "amount": "100.00", "description": None, "date": "2026-04-01"},
+        headers=headers,
+    )
+    assert moved.status_code == 200
+    assert _summary(end_date="2026-03-31") == (Decimal("350.00"), Decimal("0"), 2)
+    assert _summary(start_date="2026-04-01") == (Decimal("0"), Decimal("100.00"), 1)
+
+    assert client.delete(f"{api_prefix}/categories/{category['id']}", headers=headers).status_code == 204
+    assert _summary() == (Decimal("350.00"), Decimal("100.00"), 3)
+
+    assert client.delete(f"{api_prefix}/transactions/{sale['id']}", headers=headers).status_code == 204
+    assert _summary() == (Decimal("50.00"), Decimal("100.00"), 2)
+
+    user_id = UUID(client.get(f"{api_prefix}/auth/me", headers=headers).json()["id"])
+    counts = select(DailyBalanceModel.transaction_count).where(DailyBalanceModel.user_id == user_id)
+    # O PUT que mudou a data e o DELETE zeraram dias: as linhas saem na mesma transação.
+    assert sorted(db_session.execute(counts).scalars().all()) == [1, 1]
+    DailyBalanceRepositoryImpl(db_session).rebuild(user_id=user_id)
+    assert _summary() == (Decimal("50.00"), Decimal("100.00"), 2)
+    # Dias zerados por edições e exclusões não voltam na reconstrução.
+    assert 0 not in db_session.execute(counts).scalars().all()
+
+    # A reconstrução de um usuário não trava transactions para os demais.
+    with db_engine.connect() as connection:
+        DailyBalanceRepositoryImpl(Session(bind=connection))._lock(user_id)
+        modes = connection.execute(
+            text("SELECT mode FROM pg_locks WHERE pid = pg_backend_pid() AND relation = 'transactions'::regclass")
+        ).scalars().all()
+        assert "ShareLock" not in modes
+        connection.rollback()
+
+    # Base criada por create_all: rollup vazio é gerado a partir dos lançamentos.
+    db_session.execute(delete(DailyBalanceModel))
+    assert DailyBalanceRepositoryImpl(db_session).backfill() is True
+    assert _summary() == (Decimal("50.00"), Decimal("100.00"), 2)
+    assert DailyBalanceRepositoryImpl(db_session).backfill() is False
+
+
+def test_dashboard_timeseries(client, api_prefix):
+    headers, _ = _register_and_login(client, api_prefix)
+    entries = [
+        ("income", "1000.00", "2026-01-10"),
+        ("expense", "300.00", "2026-01-20"),
+        ("income", "500.00", "2026-02-05"),
+        ("expense", "200.00", "2026-02-06"),
+        ("expense", "100.00", "2026-03-15"),
+    ]
+    for type_, amount, day in entries:
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={"category_id": None, "type": type_, "amount": amount, "description": None, "date": day},
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    monthly = client.get(
+        f"{api_prefix}/dashboard/timeseries",
+        params={"granularity": "month", "start_date": "2026-02-01"},
+        headers=headers,
+    )
+    assert monthly.status_code == 200
+    data = monthly.json()
+    assert data["granularity"] == "month"
+    points = [
+        (item["period"], Decimal(str(item["total_income"])), Decimal(str(item["total_expense"])), Decimal(str(item["balance"])))
+        for item in data["items"]
+    ]
+    assert points == [
+        ("2026-02-01", Decimal("500.00"), Decimal("200.00"), Decimal("1000.00")),
+        ("2026-03-01", Decimal("0"), Decimal("100.00"), Decimal("900.00")),
+    ]
+
+    weekly = client.get(
+        f"{api_prefix}/dashboard/timeseries",
+        params={"granularity": "week", "end_date": "2026-01-31"},
+        headers=headers,
+    )
+    assert weekly.status_code == 200
+    assert [item["period"] for item in weekly.json()["items"]] == ["2026-01-05", "2026-01-19"]
+    assert Decimal(str(weekly.json()["items"][-1]["balance"])) == Decimal("700.00")
+
+    invalid = client.get(f"{api_prefix}/dashboard/timeseries", params={"granularity": "year"}, headers=headers)
+    assert invalid.status_code == 422
+
+
+def test_dashboard_timeseries_skips_periods_emptied_by_writes(client, api_prefix):
+    headers, _ = _register_and_login(client, api_prefix)
+    ids = []
+    for type_, amount, day in (("income", "1000.00", "2026-01-10"), ("expense", "100.00", "2026-05-20")):
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={"category_id": None, "type": type_, "amount": amount, "description": None, "date": day},
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        ids.append(resp.json()["id"])
+
+    assert client.delete(f"{api_prefix}/transactions/{ids[0]}", headers=headers).status_code == 204
+    moved = client.put(
+        f"{api_prefix}/transactions/{ids[1]}",
+        json={"category_id": None, "type": "expense", "amount": "100.00", "description": None, "date": "2026-06-02"},
+        headers=headers,
+    )
+    assert moved.status_code == 200
+
+    monthly = client.get(f"{api_prefix}/dashboard/timeseries", params={"granularity": "month"}, headers=headers)
+    assert monthly.status_code == 200
+    assert [(item["period"], Decimal(str(item["balance"]))) for item in monthly.json()["items"]] == [
+        ("2026-06-01", Decimal("-100.00"))
+    ]
+
+
+def test_dashboard_category_breakdown(client, api_prefix):
+    headers, _ = _register_and_login(client, api_prefix)
+    category_ids = {}
+    for name, type_ in [("Vendas", "income"), ("Aluguel", "expense"), ("Material", "expense")]:
+        resp = client.post(f"{api_prefix}/categories", json={"name": name, "type": type_}, headers=headers)
+        assert resp.status_code == 201
+        category_ids[name] = resp.json()["id"]
+
+    entries = [
+        ("Vendas", "income", "900.00"),
+        ("Vendas", "income", "100.00"),
+        ("Aluguel", "expense", "400.00"),
+        ("Material", "expense", "30.00"),
+        (None, "expense", "20.00"),
+    ]
+    for name, type_, amount in entries:
+        resp = client.post(
+            f"{api_prefix}/transactions",
+            json={
+                "category_id": category_ids.get(name),
+                "type": type_,
+                "amount": amount,
+                "description": None,
+                "date": "2026-05-10",
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+    full = client.get(f"{api_prefix}/dashboard/categories", headers=headers)
+    assert full.status_code == 200
+    items = full.json()["items"]
+    assert [item["name"] for item in items] == ["Vendas", "Aluguel", "Material", "Sem categoria"]
+    assert items[0]["category_id"] == category_ids["Vendas"]
+    assert Decimal(str(items[0]["total_income"])) == Decimal("1000.00")
+    assert items[0]["transaction_count"] == 2
+    assert items[3]["category_id"] is None
+
+    top = client.get(f"{api_prefix}/dashboard/categories", params={"top": 2}, headers=headers)
+    assert top.status_code == 200
+    items = top.json()["items"]
+    assert [item["name"] for item in items] == ["Vendas", "Aluguel", "Outros"]
+    assert Decimal(str(items[2]["total_expense"])) == Decimal("50.00")
+    assert items[2]["transaction_count"] == 2
+
+
+def test_current_user_cache_is_invalidated_on_deactivation(client, api_prefix, db_session):
+    from app.infrastructure.cache.user_cache import user_cache
+    from app.infrastructure.db.repositories.user_repository_impl import UserRepositoryImpl
+
+    headers, _ = _register_and_login(client, api_prefix)
+    first = client.get(f"{api_prefix}/auth/me", headers=headers)
+    assert first.status_code == 200
+    user_id = UUID(first.json()["id"])
+
+    hits_before = user_cache.stats()["hits"]
+    assert client.get(f"{api_prefix}/auth/me", headers=headers).status_code == 200
+    assert user_cache.stats()["hits"] == hits_before + 1
+
+    UserRepositoryImpl(db_session).set_active(user_id, False)
+    response = client.get(f"{api_prefix}/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Usuário inativo"
+
+
+def test_login_returns_503_when_password_pool_is_saturated(client, api_prefix, monkeypatch):
+    import asyncio
+    import threading
+
+    from app.infrastructure.security import password
+
+    email = _new_email()
+    assert client.post(f"{api_prefix}/auth/register", json={"email": email, "password": "secret123"}).status_code == 201
+
+    saturated = password.BoundedExecutor(workers=1, queue_size=0)
+    release = threading.Event()
+    started = threading.Event()
+
+    def _block():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=saturated.run, args=(_block,))
+    worker.start()
+    started.wait(5)
+    monkeypatch.setattr(password, "password_executor", saturated)
+    try:
+        response = client.post(f"{api_prefix}/auth/login", json={"email": email, "password": "secret123"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert saturated.stats()["rejected"] == 1
+    finally:
+        release.set()
+        worker.join()
+
+    # O slot volta ao pool quando o hash assíncrono termina.
+    assert asyncio.run(saturated.run_async(lambda: "ok")) == "ok"
+    assert saturated.stats()["queued"] == 0 and saturated._slots.acquire(blocking=False)
+
+
+def test_async_repositories_roundtrip():
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from app.core.config import get_settings
+    from app.domain.entities.category import CategoryType
+    from app.domain.entities.transaction import TransactionType
+    from app.infrastructure.db.repositories.async_repositories import (
+        AsyncCategoryRepositoryImpl,
+        AsyncTransactionRepositoryImpl,
+        AsyncUserRepositoryImpl,
+    )
+
+    async def scenario():
+        engine = create_async_engine(get_settings().database_url)
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint")
+            try:
+                user = await AsyncUserRepositoryImpl(session).create(email=_new_email(), hashed_password="x")
+                category = await AsyncCategoryRepositoryImpl(session).create(user.id, "Vendas", CategoryType.INCOME)
+                repo = AsyncTransactionRepositoryImpl(session)
+                created = await repo.create(
+                    user.id, category.id, TransactionType.INCOME, Decimal("42.00"), None, date(2026, 6, 1)
+                )
+                page = await repo.list_page_by_user(user.id, limit=10)
+                summary = await repo.summary(user.id)
+                streamed = [t.id async for batch in repo.iter_by_user(user.id, batch_size=1) for t in batch]
+            finally:
+                await session.close()
+                await transaction.rollback()
+        await engine.dispose()
+        return created, page, summary, streamed
+
+    created, page, summary, streamed = asyncio.run(scenario())
+    assert [t.id for t in page] == [created.id]
+    assert streamed == [created.id]
+    assert summary["total_income"] == Decimal("42.00")
+    assert summary["transaction_count"] == 1
+
+
+def test_engine_pool_options_and_checkout_metric(monkeypatch):
+    from sqlalchemy import text
+    from sqlalchemy.pool import NullPool
+
+    from app.core.metrics import db_pool_checkout_wait_seconds
+    from app.infrastructure.db import pool
+    from app.infrastructure.db.session import engine
+
+    before = db_pool_checkout_wait_seconds.snapshot(engine="sync")["count"]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar_one() == 1
+    assert db_pool_checkout_wait_seconds.snapshot(engine="sync")["count"] == before + 1
+
+    options = pool.engine_options()
+    assert options["poolclass"] is pool.TimedQueuePool
+    assert options["pool_size"] == pool.settings.db_pool_size
+
+    monkeypatch.setattr(pool.settings, "db_pool_mode", "transaction")
+    options = pool.engine_options(is_async=True)
+    assert options["poolclass"] is NullPool
+    assert options["connect_args"] == {"prepare_threshold": None}
@@ -4,3 +4,8 @@ export const getDashboardSummary = async (params) => {
   const { data } = await api.get('/dashboard/summary', { params })
   return data
 }
+
+export const getDashboardTimeseries = async (params) => {
+  const { data } = await api.get('/dashboard/timeseries', { params })
+  return data
+}
@@ -1,8 +1,8 @@
 ﻿import api from './client'
 
 export const listTransactions = async (params) => {
-  const { data } = await api.get('/transactions', { params })
-  return data
+  const { data, headers } = await api.get('/transactions', { params })
+  return { items: data, nextCursor: headers['x-next-cursor'] || null }
 }
 
 export const createTransaction = async (payload) => {
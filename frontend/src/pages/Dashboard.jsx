@@ -1,7 +1,7 @@
 ﻿import { useEffect, useRef, useState } from 'react'
 import Layout from '../components/Layout'
 import Card from '../components/Card'
-import { getDashboardSummary } from '../api/dashboard'
+import { getDashboardSummary, getDashboardTimeseries } from '../api/dashboard'
 import { listTransactions } from '../api/transactions'
 import { formatCurrency, formatDate } from '../utils/format'
 
@@ -9,6 +9,7 @@ export default function Dashboard() {
   const isMounted = useRef(true)
   const [summary, setSummary] = useState(null)
   const [transactions, setTransactions] = useState([])
+  const [cashFlow, setCashFlow] = useState([])
   const [startDate, setStartDate] = useState('')
   const [endDate, setEndDate] = useState('')
 
@@ -18,14 +19,16 @@ export default function Dashboard() {
       if (startDate) params.start_date = startDate
       if (endDate) params.end_date = endDate
 
-      const [summaryData, transactionsData] = await Promise.all([
+      const [summaryData, transactionsData, timeseriesData] = await Promise.all([
         getDashboardSummary(params),
-        listTransactions(params)
+        listTransactions({ ...params, limit: 5 }),
+        getDashboardTimeseries({ ...params, granularity: 'month' })
       ])
 
       if (!isMounted.current) return
       setSummary(summaryData)
-      setTransactions(transactionsData.slice(0, 5))
+      setCashFlow(timeseriesData.items)
+      setTransactions(transactionsData.items)
     } catch (error) {
       console.error('Falha ao carregar dados do dashboard.', error)
     }
@@ -64,6 +67,30 @@ export default function Dashboard() {
         <Card title="Saldo" value={formatCurrency(summary?.balance || 0)} tone="neutral" />
       </section>
 
+      <section className="panel">
+        <div className="panel-header">
+          <h2>Fluxo de caixa mensal</h2>
+          <p>Entradas, saídas e saldo acumulado por mês.</p>
+        </div>
+        <div className="table">
+          <div className="table-row table-head">
+            <span>Mês</span>
+            <span>Entradas</span>
+            <span>Saídas</span>
+            <span>Saldo</span>
+          </div>
+          {cashFlow.map((item) => (
+            <div className="table-row" key={item.period}>
+              <span>{formatDate(item.period)}</span>
+              <span>{formatCurrency(item.total_income)}</span>
+              <span>{formatCurrency(item.total_expense)}</span>
+              <span>{formatCurrency(item.balance)}</span>
+            </div>
+          ))}
+          {!cashFlow.length && <p className="empty">Nenhuma movimentação no período.</p>}
+        </div>
+      </section>
+
       <section className="panel">
         <div className="panel-header">
           <h2>Últimas movimentações</h2>
@@ -18,10 +18,13 @@ const emptyForm = {
   category_id: ''
 }
 
+const PAGE_SIZE = 50
+
 export default function Transactions() {
   const isMounted = useRef(true)
   const [transactions, setTransactions] = useState([])
   const [categories, setCategories] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [editingId, setEditingId] = useState(null)
   const [filters, setFilters] = useState({
     start_date: '',
@@ -31,26 +34,42 @@ export default function Transactions() {
   })
   const [form, setForm] = useState(emptyForm)
 
+  const buildParams = () => {
+    const params = {}
+    if (filters.start_date) params.start_date = filters.start_date
+    if (filters.end_date) params.end_date = filters.end_date
+    if (filters.type) params.type = filters.type
+    if (filters.category_id) params.category_id = filters.category_id
+    return params
+  }
+
   const loadData = async () => {
     try {
-      const params = {}
-      if (filters.start_date) params.start_date = filters.start_date
-      if (filters.end_date) params.end_date = filters.end_date
-      if (filters.type) params.type = filters.type
-      if (filters.category_id) params.category_id = filters.category_id
-
       const [transactionsData, categoriesData] = await Promise.all([
-        listTransactions(params),
+        listTransactions({ ...buildParams(), limit: PAGE_SIZE }),
         listCategories()
       ])
       if (!isMounted.current) return
-      setTransactions(transactionsData)
+      setTransactions(transactionsData.items)
+      setNextCursor(transactionsData.nextCursor)
       setCategories(categoriesData)
     } catch (error) {
       console.error('Falha ao carregar movimentacoes.', error)
     }
   }
 
+  const loadMore = async () => {
+    if (!nextCursor) return
+    try {
+      const transactionsData = await listTransactions({ ...buildParams(), limit: PAGE_SIZE, cursor: nextCursor })
+      if (!isMounted.current) return
+      setTransactions((current) => [...current, ...transactionsData.items])
+      setNextCursor(transactionsData.nextCursor)
+    } catch (error) {
+      console.error('Falha ao carregar movimentacoes.', error)
+    }
+  }
+
   useEffect(() => {
     loadData()
     return () => {
@@ -99,13 +118,7 @@ export default function Transactions() {
   }
 
   const handleExport = async () => {
-    const params = {}
-    if (filters.start_date) params.start_date = filters.start_date
-    if (filters.end_date) params.end_date = filters.end_date
-    if (filters.type) params.type = filters.type
-    if (filters.category_id) params.category_id = filters.category_id
-
-    const blob = await exportTransactions(params)
+    const blob = await exportTransactions(buildParams())
     const url = window.URL.createObjectURL(blob)
     const link = document.createElement('a')
     link.href = url
@@ -240,7 +253,7 @@ export default function Transactions() {
       <section className="panel">
         <div className="panel-header">
           <h2>Lista de movimentações</h2>
-          <p>Total de movimentações: {transactions.length}</p>
+          <p>Movimentações carregadas: {transactions.length}</p>
         </div>
         <div className="table">
           <div className="table-row table-head">
@@ -268,6 +281,13 @@ export default function Transactions() {
           ))}
           {!transactions.length && <p className="empty">Nenhuma movimentação encontrada.</p>}
         </div>
+        {nextCursor && (
+          <div className="form-actions">
+            <button className="btn btn-outline" type="button" onClick={loadMore}>
+              Carregar mais
+            </button>
+          </div>
+        )}
       </section>
     </Layout>
   )